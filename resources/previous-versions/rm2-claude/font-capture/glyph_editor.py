@@ -7,12 +7,19 @@ Inkscape-like interface with real-time editing, stroke ordering, and font manage
 import sys
 import json
 import math
+import mmap
+import re
+import gzip
 import http.server
-import socketserver
 import webbrowser
 import threading
 from urllib.parse import parse_qs, urlparse
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 # Configuration
 WACOM_MAX_X = 20966
@@ -20,6 +27,14 @@ WACOM_MAX_Y = 15725
 RM2_WIDTH = 1404
 RM2_HEIGHT = 1872
 
+# One PEN command per line: PEN_DOWN x y or PEN_MOVE x y (exactly two integers),
+# or PEN_UP followed by anything, e.g. a trailing comment. Only the first letter
+# of DOWN/MOVE is captured, which is all parse_pen_commands needs to dispatch;
+# PEN_UP matches with every group empty
+PEN_LINE_RE = re.compile(
+    rb"^[ \t]*PEN_(?:(?=DOWN|MOVE)([DM])(?:OWN|OVE)[ \t]+(-?\d+)[ \t]+(-?\d+)[ \t]*\r?$|UP\b.*$)",
+    re.MULTILINE)
+
 
 def parse_pen_commands(filename):
     """Parse PEN commands into stroke list"""
@@ -27,24 +42,25 @@ def parse_pen_commands(filename):
     current_stroke = []
 
     try:
-        with open(filename, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-
-                parts = line.split()
-                cmd = parts[0]
-
-                if cmd == "PEN_DOWN" and len(parts) == 3:
-                    current_stroke = [(int(parts[1]), int(parts[2]))]
-                elif cmd == "PEN_MOVE" and len(parts) == 3:
-                    if current_stroke:
-                        current_stroke.append((int(parts[1]), int(parts[2])))
-                elif cmd == "PEN_UP":
-                    if current_stroke:
-                        strokes.append(current_stroke)
-                    current_stroke = []
+        with open(filename, 'rb') as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # Empty file, nothing to map
+                return strokes
+
+            with data:
+                # findall yields plain tuples (all b"" for PEN_UP), skipping a match
+                # object per line; MOVE is by far the most common command
+                for cmd, x, y in PEN_LINE_RE.findall(data):
+                    if cmd == b"M":
+                        if current_stroke:
+                            current_stroke.append((int(x), int(y)))
+                    elif cmd == b"D":
+                        current_stroke = [(int(x), int(y))]
+                    else:
+                        if current_stroke:
+                            strokes.append(current_stroke)
+                        current_stroke = []
     except Exception as e:
         print(f"Error parsing file: {e}")
         return []
@@ -52,10 +68,22 @@ def parse_pen_commands(filename):
     return strokes
 
 
+def dumps_json(obj):
+    """Serialize to compact JSON, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, separators=(',', ':'))
+
+
+def json_parse_literal(json_text):
+    """Quote JSON text as a JS string for JSON.parse(), safe inside <script>"""
+    return json.dumps(json_text).replace('</', '<\\/')
+
+
 def generate_html_editor(strokes, input_file):
     """Generate advanced HTML editor with Inkscape-like features"""
 
-    strokes_json = json.dumps([
+    payload = [
         {
             "id": i,
             "points": stroke,
@@ -65,7 +93,8 @@ def generate_html_editor(strokes, input_file):
             "name": f"Stroke {i+1}"
         }
         for i, stroke in enumerate(strokes)
-    ])
+    ]
+    strokes_json = json_parse_literal(dumps_json(payload))
 
     html = f"""<!DOCTYPE html>
 <html>
@@ -145,6 +174,9 @@ def generate_html_editor(strokes, input_file):
             position: absolute;
             cursor: crosshair;
         }}
+        #previewCanvas {{
+            pointer-events: none;
+        }}
         .panel-section {{
             margin-bottom: 20px;
         }}
@@ -384,6 +416,7 @@ def generate_html_editor(strokes, input_file):
         <!-- Canvas Area -->
         <div class="canvas-area" id="canvasArea">
             <canvas id="canvas"></canvas>
+            <canvas id="previewCanvas"></canvas>
         </div>
 
         <!-- Right Panel: Properties -->
@@ -452,9 +485,50 @@ def generate_html_editor(strokes, input_file):
         </div>
     </div>
 
+    <a id="downloadLink" style="display: none"></a>
+
+    <!-- Freehand preview painter: runs in a Worker on an OffscreenCanvas when supported -->
+    <script type="text/js-worker" id="previewWorkerSrc">
+        let previewCanvas = null;
+        let previewCtx = null;
+        let view = {{ scale: 1, ox: 0, oy: 0 }};
+        let last = null;
+
+        function handlePreviewMessage(m) {{
+            if (m.type === 'init') {{
+                previewCanvas = m.canvas;
+                previewCtx = previewCanvas.getContext('2d');
+            }} else if (m.type === 'resize') {{
+                previewCanvas.width = m.width;
+                previewCanvas.height = m.height;
+            }} else if (m.type === 'begin') {{
+                view = m.view;
+                last = null;
+                previewCtx.clearRect(0, 0, previewCanvas.width, previewCanvas.height);
+                previewCtx.strokeStyle = '#0d6efd';
+                previewCtx.lineWidth = 2;
+                previewCtx.lineCap = 'round';
+                previewCtx.lineJoin = 'round';
+            }} else if (m.type === 'point') {{
+                const x = m.x * view.scale + view.ox;
+                const y = m.y * view.scale + view.oy;
+                if (last) {{
+                    previewCtx.beginPath();
+                    previewCtx.moveTo(last.x, last.y);
+                    previewCtx.lineTo(x, y);
+                    previewCtx.stroke();
+                }}
+                last = {{ x, y }};
+            }} else if (m.type === 'clear') {{
+                last = null;
+                previewCtx.clearRect(0, 0, previewCanvas.width, previewCanvas.height);
+            }}
+        }}
+    </script>
+
     <script>
         // Global state
-        let strokes = {strokes_json};
+        let strokes = JSON.parse({strokes_json});
         let selectedStrokeIds = new Set();
         let currentTool = 'select';
         let currentGlyph = '';
@@ -463,18 +537,64 @@ def generate_html_editor(strokes, input_file):
         let redoStack = [];
         let draggedStroke = null;
 
+        // Stroke id -> index into strokes, rebuilt after every mutation
+        const strokeIndex = new Map();
+        let nextStrokeId = 0;
+
+        // Stroke id -> stroke list DOM nodes, reused across updateStrokeList calls
+        const strokeItems = new Map();
+
         // Canvas state
         const canvas = document.getElementById('canvas');
         const ctx = canvas.getContext('2d');
+
+        // Cached element references for the status/stat panels and other hot paths
+        const DOM = {{
+            canvasArea: document.getElementById('canvasArea'),
+            strokeList: document.getElementById('strokeList'),
+            glyphGrid: document.getElementById('glyphGrid'),
+            glyphChar: document.getElementById('glyphChar'),
+            glyphName: document.getElementById('glyphName'),
+            strokeColor: document.getElementById('strokeColor'),
+            statusTool: document.getElementById('statusTool'),
+            statusCursor: document.getElementById('statusCursor'),
+            statusZoom: document.getElementById('statusZoom'),
+            statStrokes: document.getElementById('statStrokes'),
+            statPoints: document.getElementById('statPoints'),
+            statSelected: document.getElementById('statSelected'),
+            downloadLink: document.getElementById('downloadLink')
+        }};
         let canvasOffset = {{ x: 0, y: 0 }};
         let canvasScale = 1.0;
         let isDragging = false;
         let dragStart = null;
         let currentDrawStroke = null;
         let selectedNodes = new Set();
+        let gridCache = {{ key: null, path: null }};
+        const preview = createPreviewPainter(document.getElementById('previewCanvas'));
+
+        // Paint the in-progress stroke on the overlay canvas. With OffscreenCanvas the
+        // painting happens in a Worker; otherwise the same handler runs on this thread.
+        function createPreviewPainter(overlay) {{
+            const src = document.getElementById('previewWorkerSrc').textContent;
+            if (window.Worker && overlay.transferControlToOffscreen) {{
+                const blob = new Blob([src + '\\nonmessage = (e) => handlePreviewMessage(e.data);'],
+                                      {{ type: 'text/javascript' }});
+                const url = URL.createObjectURL(blob);
+                const worker = new Worker(url);
+                URL.revokeObjectURL(url);
+                const off = overlay.transferControlToOffscreen();
+                worker.postMessage({{ type: 'init', canvas: off }}, [off]);
+                return {{ post: (m) => worker.postMessage(m) }};
+            }}
+            const handle = new Function(src + '\\nreturn handlePreviewMessage;')();
+            handle({{ type: 'init', canvas: overlay }});
+            return {{ post: handle }};
+        }}
 
         // Initialize
         function init() {{
+            reindexStrokes();
             resizeCanvas();
             window.addEventListener('resize', resizeCanvas);
             setupCanvasEvents();
@@ -485,9 +605,10 @@ def generate_html_editor(strokes, input_file):
         }}
 
         function resizeCanvas() {{
-            const area = document.getElementById('canvasArea');
+            const area = DOM.canvasArea;
             canvas.width = area.clientWidth;
             canvas.height = area.clientHeight;
+            preview.post({{ type: 'resize', width: canvas.width, height: canvas.height }});
             render();
         }}
 
@@ -523,12 +644,18 @@ def generate_html_editor(strokes, input_file):
             }} else if (currentTool === 'draw') {{
                 // Start new stroke
                 currentDrawStroke = [wx, wy];
+                preview.post({{
+                    type: 'begin',
+                    view: {{ scale: canvasScale, ox: canvasOffset.x, oy: canvasOffset.y }}
+                }});
+                preview.post({{ type: 'point', x: wx, y: wy }});
             }} else if (currentTool === 'erase') {{
                 // Delete stroke at cursor
                 const clickedStroke = findStrokeAt(wx, wy);
                 if (clickedStroke !== null) {{
                     saveUndo();
                     strokes = strokes.filter(s => s.id !== clickedStroke.id);
+                    reindexStrokes();
                     updateStrokeList();
                     render();
                 }}
@@ -553,23 +680,14 @@ def generate_html_editor(strokes, input_file):
             const wx = screenToWacom(mx, my).x;
             const wy = screenToWacom(mx, my).y;
 
-            document.getElementById('statusCursor').textContent = `(${{wx}}, ${{wy}})`;
+            DOM.statusCursor.textContent = `(${{wx}}, ${{wy}})`;
 
             if (!isDragging) return;
 
             if (currentTool === 'draw' && currentDrawStroke) {{
+                // Strokes are unchanged while drawing, so only the preview is painted
                 currentDrawStroke.push(wx, wy);
-                render();
-                // Show preview
-                ctx.strokeStyle = '#0d6efd';
-                ctx.lineWidth = 2;
-                ctx.beginPath();
-                for (let i = 0; i < currentDrawStroke.length; i += 2) {{
-                    const p = wacomToScreen(currentDrawStroke[i], currentDrawStroke[i+1]);
-                    if (i === 0) ctx.moveTo(p.x, p.y);
-                    else ctx.lineTo(p.x, p.y);
-                }}
-                ctx.stroke();
+                preview.post({{ type: 'point', x: wx, y: wy }});
             }}
         }}
 
@@ -584,7 +702,7 @@ def generate_html_editor(strokes, input_file):
                 // Add new stroke
                 saveUndo();
                 const newStroke = {{
-                    id: strokes.length,
+                    id: nextStrokeId++,
                     points: points,
                     visible: true,
                     selected: false,
@@ -592,9 +710,11 @@ def generate_html_editor(strokes, input_file):
                     name: `Stroke ${{strokes.length + 1}}`
                 }};
                 strokes.push(newStroke);
+                reindexStrokes();
                 updateStrokeList();
             }}
 
+            if (currentDrawStroke) preview.post({{ type: 'clear' }});
             isDragging = false;
             currentDrawStroke = null;
             render();
@@ -605,7 +725,7 @@ def generate_html_editor(strokes, input_file):
             const delta = e.deltaY > 0 ? 0.9 : 1.1;
             canvasScale *= delta;
             canvasScale = Math.max(0.1, Math.min(10, canvasScale));
-            document.getElementById('statusZoom').textContent = Math.round(canvasScale * 100) + '%';
+            DOM.statusZoom.textContent = Math.round(canvasScale * 100) + '%';
             render();
         }}
 
@@ -683,115 +803,213 @@ def generate_html_editor(strokes, input_file):
             return result;
         }}
 
-        function render() {{
-            ctx.clearRect(0, 0, canvas.width, canvas.height);
-
-            // Draw grid
-            ctx.strokeStyle = '#2d2d2d';
-            ctx.lineWidth = 1;
+        function getGridPath() {{
             const gridSize = 100 * canvasScale;
-            for (let x = canvasOffset.x % gridSize; x < canvas.width; x += gridSize) {{
-                ctx.beginPath();
-                ctx.moveTo(x, 0);
-                ctx.lineTo(x, canvas.height);
-                ctx.stroke();
+            const ox = canvasOffset.x % gridSize;
+            const oy = canvasOffset.y % gridSize;
+            const key = `${{canvas.width}},${{canvas.height}},${{gridSize}},${{ox}},${{oy}}`;
+            if (gridCache.key === key) return gridCache.path;
+
+            const path = new Path2D();
+            for (let x = ox; x < canvas.width; x += gridSize) {{
+                path.moveTo(x, 0);
+                path.lineTo(x, canvas.height);
             }}
-            for (let y = canvasOffset.y % gridSize; y < canvas.height; y += gridSize) {{
-                ctx.beginPath();
-                ctx.moveTo(0, y);
-                ctx.lineTo(canvas.width, y);
-                ctx.stroke();
+            for (let y = oy; y < canvas.height; y += gridSize) {{
+                path.moveTo(0, y);
+                path.lineTo(canvas.width, y);
+            }}
+            gridCache = {{ key, path }};
+            return path;
+        }}
+
+        // Wacom coordinates fit in 16 bits, so each points array is packed once into a
+        // contiguous Uint16Array [x0, y0, x1, y1, ...] for rendering. Points arrays are
+        // replaced, never mutated in place, so the cache never goes stale.
+        const packedPoints = new WeakMap();
+
+        function getPackedPoints(points) {{
+            let flat = packedPoints.get(points);
+            if (!flat) {{
+                flat = new Uint16Array(points.length * 2);
+                for (let i = 0; i < points.length; i++) {{
+                    flat[2 * i] = Math.max(0, Math.min(0xFFFF, points[i][0]));
+                    flat[2 * i + 1] = Math.max(0, Math.min(0xFFFF, points[i][1]));
+                }}
+                packedPoints.set(points, flat);
             }}
+            return flat;
+        }}
 
-            // Draw strokes
-            strokes.forEach(stroke => {{
-                if (!stroke.visible) return;
+        function traceStroke(flat) {{
+            const s = canvasScale, ox = canvasOffset.x, oy = canvasOffset.y;
+            ctx.beginPath();
+            ctx.moveTo(flat[0] * s + ox, flat[1] * s + oy);
+            for (let i = 2; i < flat.length; i += 2) {{
+                ctx.lineTo(flat[i] * s + ox, flat[i + 1] * s + oy);
+            }}
+        }}
 
-                const points = stroke.points;
-                if (points.length < 2) return;
+        // Hot case: nothing selected and not in node mode
+        function drawStrokesPlain() {{
+            ctx.lineWidth = 2;
+            ctx.lineCap = 'round';
+            ctx.lineJoin = 'round';
+            for (const stroke of strokes) {{
+                if (!stroke.visible || stroke.points.length < 2) continue;
+                traceStroke(getPackedPoints(stroke.points));
+                ctx.strokeStyle = stroke.color || '#000000';
+                ctx.stroke();
+            }}
+        }}
 
-                ctx.beginPath();
-                const p0 = wacomToScreen(points[0][0], points[0][1]);
-                ctx.moveTo(p0.x, p0.y);
+        function drawStrokesFull() {{
+            const showAllNodes = currentTool === 'node';
+            ctx.lineCap = 'round';
+            ctx.lineJoin = 'round';
+            ctx.fillStyle = '#0d6efd';
+            for (const stroke of strokes) {{
+                if (!stroke.visible) continue;
 
-                for (let i = 1; i < points.length; i++) {{
-                    const p = wacomToScreen(points[i][0], points[i][1]);
-                    ctx.lineTo(p.x, p.y);
-                }}
+                const points = stroke.points;
+                if (points.length < 2) continue;
 
-                ctx.strokeStyle = selectedStrokeIds.has(stroke.id) ? '#0d6efd' : (stroke.color || '#000000');
-                ctx.lineWidth = selectedStrokeIds.has(stroke.id) ? 3 : 2;
-                ctx.lineCap = 'round';
-                ctx.lineJoin = 'round';
+                const selected = selectedStrokeIds.has(stroke.id);
+                const flat = getPackedPoints(points);
+                traceStroke(flat);
+                ctx.strokeStyle = selected ? '#0d6efd' : (stroke.color || '#000000');
+                ctx.lineWidth = selected ? 3 : 2;
                 ctx.stroke();
 
                 // Draw nodes if selected
-                if (selectedStrokeIds.has(stroke.id) || currentTool === 'node') {{
-                    points.forEach(([wx, wy], idx) => {{
-                        const p = wacomToScreen(wx, wy);
-                        ctx.fillStyle = '#0d6efd';
+                if (selected || showAllNodes) {{
+                    for (let i = 0; i < flat.length; i += 2) {{
+                        const p = wacomToScreen(flat[i], flat[i + 1]);
                         ctx.beginPath();
                         ctx.arc(p.x, p.y, 3, 0, 2 * Math.PI);
                         ctx.fill();
-                    }});
+                    }}
                 }}
-            }});
+            }}
+        }}
+
+        function render() {{
+            ctx.clearRect(0, 0, canvas.width, canvas.height);
+
+            // Draw grid
+            ctx.strokeStyle = '#2d2d2d';
+            ctx.lineWidth = 1;
+            ctx.stroke(getGridPath());
+
+            // Draw strokes; the plain path skips all selection/node work
+            if (selectedStrokeIds.size === 0 && currentTool !== 'node') {{
+                drawStrokesPlain();
+            }} else {{
+                drawStrokesFull();
+            }}
 
             updateStats();
         }}
 
+        function createStrokeItem(id) {{
+            const div = document.createElement('div');
+            div.draggable = true;
+
+            const handle = document.createElement('span');
+            handle.className = 'handle';
+            handle.textContent = '☰';
+
+            const checkbox = document.createElement('input');
+            checkbox.type = 'checkbox';
+            checkbox.onchange = () => toggleStrokeVisibility(id);
+
+            const swatch = document.createElement('div');
+            swatch.className = 'color-swatch';
+            swatch.onclick = () => selectStroke(id);
+
+            const name = document.createElement('span');
+            name.className = 'name';
+
+            const points = document.createElement('span');
+            points.className = 'points';
+
+            div.append(handle, checkbox, swatch, name, points);
+
+            div.onclick = (e) => {{
+                if (e.target.tagName !== 'INPUT') selectStroke(id);
+            }};
+
+            div.ondragstart = (e) => {{
+                draggedStroke = id;
+                e.dataTransfer.effectAllowed = 'move';
+            }};
+
+            div.ondragover = (e) => {{
+                e.preventDefault();
+                e.dataTransfer.dropEffect = 'move';
+            }};
+
+            div.ondrop = (e) => {{
+                e.preventDefault();
+                if (draggedStroke !== null && draggedStroke !== id) {{
+                    reorderStrokes(draggedStroke, id);
+                }}
+            }};
+
+            return {{ div, checkbox, swatch, name, points }};
+        }}
+
         function updateStrokeList() {{
-            const list = document.getElementById('strokeList');
-            list.innerHTML = '';
+            const list = DOM.strokeList;
+            const frag = document.createDocumentFragment();
+            const live = new Set();
 
             strokes.forEach(stroke => {{
-                const div = document.createElement('div');
-                div.className = 'stroke-item' +
+                let item = strokeItems.get(stroke.id);
+                if (!item) {{
+                    item = createStrokeItem(stroke.id);
+                    strokeItems.set(stroke.id, item);
+                }}
+                live.add(stroke.id);
+
+                item.div.className = 'stroke-item' +
                     (selectedStrokeIds.has(stroke.id) ? ' selected' : '') +
                     (!stroke.visible ? ' hidden' : '');
-                div.draggable = true;
-
-                div.innerHTML = `
-                    <span class="handle">☰</span>
-                    <input type="checkbox" ${{stroke.visible ? 'checked' : ''}}
-                        onchange="toggleStrokeVisibility(${{stroke.id}})" />
-                    <div class="color-swatch" style="background: ${{stroke.color}}"
-                        onclick="selectStroke(${{stroke.id}})"></div>
-                    <span class="name">${{stroke.name}}</span>
-                    <span class="points">${{stroke.points.length}}pts</span>
-                `;
-
-                div.onclick = (e) => {{
-                    if (e.target.tagName !== 'INPUT') selectStroke(stroke.id);
-                }};
+                item.checkbox.checked = stroke.visible;
+                item.swatch.style.background = stroke.color;
+                item.name.textContent = stroke.name;
+                item.points.textContent = stroke.points.length + 'pts';
 
-                div.ondragstart = (e) => {{
-                    draggedStroke = stroke.id;
-                    e.dataTransfer.effectAllowed = 'move';
-                }};
+                frag.appendChild(item.div);
+            }});
 
-                div.ondragover = (e) => {{
-                    e.preventDefault();
-                    e.dataTransfer.dropEffect = 'move';
-                }};
+            for (const id of strokeItems.keys()) {{
+                if (!live.has(id)) strokeItems.delete(id);
+            }}
 
-                div.ondrop = (e) => {{
-                    e.preventDefault();
-                    if (draggedStroke !== null && draggedStroke !== stroke.id) {{
-                        reorderStrokes(draggedStroke, stroke.id);
-                    }}
-                }};
+            list.replaceChildren(frag);
+        }}
 
-                list.appendChild(div);
+        function reindexStrokes() {{
+            strokeIndex.clear();
+            strokes.forEach((s, i) => {{
+                strokeIndex.set(s.id, i);
+                if (s.id >= nextStrokeId) nextStrokeId = s.id + 1;
             }});
         }}
 
+        function getStroke(id) {{
+            const idx = strokeIndex.get(id);
+            return idx === undefined ? undefined : strokes[idx];
+        }}
+
         function reorderStrokes(fromId, toId) {{
             saveUndo();
-            const fromIdx = strokes.findIndex(s => s.id === fromId);
-            const toIdx = strokes.findIndex(s => s.id === toId);
+            const fromIdx = strokeIndex.get(fromId);
+            const toIdx = strokeIndex.get(toId);
             const [moved] = strokes.splice(fromIdx, 1);
             strokes.splice(toIdx, 0, moved);
+            reindexStrokes();
             updateStrokeList();
             render();
         }}
@@ -805,7 +1023,7 @@ def generate_html_editor(strokes, input_file):
         }}
 
         function toggleStrokeVisibility(id) {{
-            const stroke = strokes.find(s => s.id === id);
+            const stroke = getStroke(id);
             if (stroke) {{
                 stroke.visible = !stroke.visible;
                 render();
@@ -816,17 +1034,17 @@ def generate_html_editor(strokes, input_file):
             if (selectedStrokeIds.size !== 1) return;
 
             const id = Array.from(selectedStrokeIds)[0];
-            const stroke = strokes.find(s => s.id === id);
+            const stroke = getStroke(id);
             if (!stroke) return;
 
-            document.getElementById('strokeColor').value = stroke.color || '#000000';
+            DOM.strokeColor.value = stroke.color || '#000000';
         }}
 
         function selectTool(tool) {{
             currentTool = tool;
             document.querySelectorAll('.tool-button').forEach(btn => btn.classList.remove('active'));
             document.getElementById('tool' + tool.charAt(0).toUpperCase() + tool.slice(1)).classList.add('active');
-            document.getElementById('statusTool').textContent = tool.charAt(0).toUpperCase() + tool.slice(1);
+            DOM.statusTool.textContent = tool.charAt(0).toUpperCase() + tool.slice(1);
 
             // Update cursor
             if (tool === 'draw') canvas.style.cursor = 'crosshair';
@@ -840,6 +1058,7 @@ def generate_html_editor(strokes, input_file):
             saveUndo();
             strokes = strokes.filter(s => !selectedStrokeIds.has(s.id));
             selectedStrokeIds.clear();
+            reindexStrokes();
             updateStrokeList();
             render();
         }}
@@ -847,7 +1066,7 @@ def generate_html_editor(strokes, input_file):
         function addNewStroke() {{
             saveUndo();
             const newStroke = {{
-                id: strokes.length,
+                id: nextStrokeId++,
                 points: [[5000, 5000], [6000, 6000]],
                 visible: true,
                 selected: false,
@@ -855,27 +1074,37 @@ def generate_html_editor(strokes, input_file):
                 name: `Stroke ${{strokes.length + 1}}`
             }};
             strokes.push(newStroke);
+            reindexStrokes();
             updateStrokeList();
             render();
         }}
 
+        // Copy stroke records but share their points arrays. Points are only ever
+        // replaced, never edited in place, so snapshots stay O(strokes) rather than
+        // re-encoding every point through JSON.
+        function cloneStrokes(list) {{
+            return list.map(s => ({{ ...s }}));
+        }}
+
         function saveUndo() {{
-            undoStack.push(JSON.parse(JSON.stringify(strokes)));
+            undoStack.push(cloneStrokes(strokes));
             redoStack = [];
         }}
 
         function undoAction() {{
             if (undoStack.length === 0) return;
-            redoStack.push(JSON.parse(JSON.stringify(strokes)));
+            redoStack.push(cloneStrokes(strokes));
             strokes = undoStack.pop();
+            reindexStrokes();
             updateStrokeList();
             render();
         }}
 
         function redoAction() {{
             if (redoStack.length === 0) return;
-            undoStack.push(JSON.parse(JSON.stringify(strokes)));
+            undoStack.push(cloneStrokes(strokes));
             strokes = redoStack.pop();
+            reindexStrokes();
             updateStrokeList();
             render();
         }}
@@ -883,22 +1112,22 @@ def generate_html_editor(strokes, input_file):
         function updateStats() {{
             const visible = strokes.filter(s => s.visible);
             const totalPoints = visible.reduce((sum, s) => sum + s.points.length, 0);
-            document.getElementById('statStrokes').textContent = visible.length;
-            document.getElementById('statPoints').textContent = totalPoints;
-            document.getElementById('statSelected').textContent =
+            DOM.statStrokes.textContent = visible.length;
+            DOM.statPoints.textContent = totalPoints;
+            DOM.statSelected.textContent =
                 selectedStrokeIds.size > 0 ? selectedStrokeIds.size : '-';
         }}
 
         function saveGlyph() {{
-            const char = document.getElementById('glyphChar').value;
+            const char = DOM.glyphChar.value;
             if (!char) {{
                 alert('Please enter a character');
                 return;
             }}
 
             fontLibrary[char] = {{
-                strokes: JSON.parse(JSON.stringify(strokes)),
-                name: document.getElementById('glyphName').value || char
+                strokes: cloneStrokes(strokes),
+                name: DOM.glyphName.value || char
             }};
 
             updateGlyphGrid();
@@ -907,9 +1136,10 @@ def generate_html_editor(strokes, input_file):
 
         function loadGlyph(char) {{
             if (!fontLibrary[char]) return;
-            strokes = JSON.parse(JSON.stringify(fontLibrary[char].strokes));
-            document.getElementById('glyphChar').value = char;
-            document.getElementById('glyphName').value = fontLibrary[char].name;
+            strokes = cloneStrokes(fontLibrary[char].strokes);
+            reindexStrokes();
+            DOM.glyphChar.value = char;
+            DOM.glyphName.value = fontLibrary[char].name;
             updateStrokeList();
             render();
         }}
@@ -918,14 +1148,15 @@ def generate_html_editor(strokes, input_file):
             if (strokes.length > 0 && !confirm('Clear current strokes?')) return;
             strokes = [];
             selectedStrokeIds.clear();
-            document.getElementById('glyphChar').value = '';
-            document.getElementById('glyphName').value = '';
+            reindexStrokes();
+            DOM.glyphChar.value = '';
+            DOM.glyphName.value = '';
             updateStrokeList();
             render();
         }}
 
         function updateGlyphGrid() {{
-            const grid = document.getElementById('glyphGrid');
+            const grid = DOM.glyphGrid;
             grid.innerHTML = '';
 
             Object.keys(fontLibrary).sort().forEach(char => {{
@@ -937,35 +1168,48 @@ def generate_html_editor(strokes, input_file):
             }});
         }}
 
+        // Save a blob through the shared hidden link. Revocation is deferred so the
+        // browser has started reading the URL before it goes away.
+        function downloadBlob(blob, filename) {{
+            const url = URL.createObjectURL(blob);
+            DOM.downloadLink.href = url;
+            DOM.downloadLink.download = filename;
+            DOM.downloadLink.click();
+            setTimeout(() => URL.revokeObjectURL(url), 0);
+        }}
+
         function exportPenCommands() {{
-            const commands = [];
-            strokes.filter(s => s.visible).forEach(stroke => {{
-                if (stroke.points.length < 1) return;
-                commands.push(`PEN_DOWN ${{stroke.points[0][0]}} ${{stroke.points[0][1]}}`);
-                for (let i = 1; i < stroke.points.length; i++) {{
-                    commands.push(`PEN_MOVE ${{stroke.points[i][0]}} ${{stroke.points[i][1]}}`);
+            const visible = strokes.filter(s => s.visible);
+            const encoder = new TextEncoder();
+            let next = 0;
+
+            // Encode one stroke per pull so the whole file never exists as one string
+            const stream = new ReadableStream({{
+                pull(controller) {{
+                    while (next < visible.length) {{
+                        const points = visible[next++].points;
+                        if (points.length < 1) continue;
+
+                        const lines = [`PEN_DOWN ${{points[0][0]}} ${{points[0][1]}}`];
+                        for (let i = 1; i < points.length; i++) {{
+                            lines.push(`PEN_MOVE ${{points[i][0]}} ${{points[i][1]}}`);
+                        }}
+                        lines.push('PEN_UP\\n');
+                        controller.enqueue(encoder.encode(lines.join('\\n')));
+                        return;
+                    }}
+                    controller.close();
                 }}
-                commands.push('PEN_UP');
             }});
 
-            const blob = new Blob([commands.join('\\n') + '\\n'], {{ type: 'text/plain' }});
-            const url = URL.createObjectURL(blob);
-            const a = document.createElement('a');
-            a.href = url;
-            a.download = 'glyph.txt';
-            a.click();
-            URL.revokeObjectURL(url);
+            new Response(stream).blob().then(blob => {{
+                downloadBlob(new Blob([blob], {{ type: 'text/plain' }}), 'glyph.txt');
+            }});
         }}
 
         function exportFont() {{
             const json = JSON.stringify(fontLibrary, null, 2);
-            const blob = new Blob([json], {{ type: 'application/json' }});
-            const url = URL.createObjectURL(blob);
-            const a = document.createElement('a');
-            a.href = url;
-            a.download = 'font.json';
-            a.click();
-            URL.revokeObjectURL(url);
+            downloadBlob(new Blob([json], {{ type: 'application/json' }}), 'font.json');
         }}
 
         function loadFont() {{
@@ -990,10 +1234,10 @@ def generate_html_editor(strokes, input_file):
         }}
 
         // Event listeners for property controls
-        document.getElementById('strokeColor').oninput = function() {{
+        DOM.strokeColor.oninput = function() {{
             if (selectedStrokeIds.size !== 1) return;
             const id = Array.from(selectedStrokeIds)[0];
-            const stroke = strokes.find(s => s.id === id);
+            const stroke = getStroke(id);
             if (stroke) {{
                 stroke.color = this.value;
                 updateStrokeList();
@@ -1011,14 +1255,25 @@ def generate_html_editor(strokes, input_file):
 
 
 class GlyphEditorHandler(http.server.SimpleHTTPRequestHandler):
-    html_content = None
+    protocol_version = 'HTTP/1.1'  # Keep-alive; every response sets Content-Length
+    disable_nagle_algorithm = True  # Send the small response without Nagle delay
+    html_bytes = None  # Encoded once in main(), served as-is on every request
+    html_gzip = None  # Same page gzip-compressed once in main()
 
     def do_GET(self):
         if self.path == '/' or self.path == '/index.html':
+            body = self.html_bytes
+            gzip_ok = 'gzip' in self.headers.get('Accept-Encoding', '')
+            if gzip_ok:
+                body = self.html_gzip
             self.send_response(200)
             self.send_header('Content-type', 'text/html; charset=utf-8')
+            if gzip_ok:
+                self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Vary', 'Accept-Encoding')
+            self.send_header('Content-Length', str(len(body)))
             self.end_headers()
-            self.wfile.write(self.html_content.encode('utf-8'))
+            self.wfile.write(body)
         else:
             self.send_error(404)
 
@@ -1068,30 +1323,29 @@ def main():
     print("Generating advanced editor interface...")
 
     html = generate_html_editor(strokes, input_file)
-    GlyphEditorHandler.html_content = html
+    GlyphEditorHandler.html_bytes = html.encode('utf-8')
+    GlyphEditorHandler.html_gzip = gzip.compress(GlyphEditorHandler.html_bytes, compresslevel=9)
 
     port = 8000
-    print(f"Starting Glyph Editor on http://localhost:{port}")
+    print(f"Starting Glyph Editor on http://127.0.0.1:{port}")
     print()
 
-    server = socketserver.TCPServer(("", port), GlyphEditorHandler)
-    server_thread = threading.Thread(target=server.serve_forever)
-    server_thread.daemon = True
-    server_thread.start()
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), GlyphEditorHandler)
 
+    # Open the browser once serve_forever() below is accepting connections
     print("Opening browser...")
-    webbrowser.open(f'http://localhost:{port}')
+    threading.Timer(0.3, webbrowser.open, args=(f'http://127.0.0.1:{port}',)).start()
     print()
     print("Glyph Editor running. Press Ctrl+C to stop.")
     print()
 
     try:
-        while True:
-            pass
+        server.serve_forever()
     except KeyboardInterrupt:
         print()
         print("Shutting down...")
-        server.shutdown()
+    finally:
+        server.server_close()
 
     return 0
 
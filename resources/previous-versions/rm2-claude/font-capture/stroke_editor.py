@@ -8,12 +8,23 @@ import sys
 import json
 import re
 import math
+import mmap
+import string
+import gzip
 import http.server
-import socketserver
 import webbrowser
 import threading
+from collections import deque
+from itertools import accumulate, islice
+from pathlib import Path
 from urllib.parse import parse_qs, urlparse
 
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:  # Optional: the pure-Python paths are used instead
+    njit = None
+
 
 # Global state
 current_strokes = []
@@ -21,50 +32,128 @@ wacom_max_x = 20966
 wacom_max_y = 15725
 
 
+class _HtmlTemplate(string.Template):
+    """string.Template using @{name} placeholders, since the page's JS uses ${...}"""
+    delimiter = '@'
+
+
+# Editor page, loaded once at import; see stroke_editor.html
+HTML_TEMPLATE = _HtmlTemplate(
+    Path(__file__).with_name('stroke_editor.html').read_text(encoding='utf-8'))
+
+
+# One PEN command per line: PEN_DOWN x y or PEN_MOVE x y (exactly two integers),
+# or PEN_UP followed by anything, e.g. a trailing comment. Only the first letter
+# of DOWN/MOVE is captured, which is all parse_pen_commands needs to dispatch;
+# PEN_UP matches with every group empty
+PEN_LINE_RE = re.compile(
+    rb"^[ \t]*PEN_(?:(?=DOWN|MOVE)([DM])(?:OWN|OVE)[ \t]+(-?\d+)[ \t]+(-?\d+)[ \t]*\r?$|UP\b.*$)",
+    re.MULTILINE)
+
+
 def parse_pen_commands(filename):
     """Parse PEN commands into stroke list"""
     strokes = []
     current_stroke = []
 
-    with open(filename, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-
-            parts = line.split()
-            cmd = parts[0]
-
-            if cmd == "PEN_DOWN" and len(parts) == 3:
-                current_stroke = [(int(parts[1]), int(parts[2]))]
-            elif cmd == "PEN_MOVE" and len(parts) == 3:
-                if current_stroke:
-                    current_stroke.append((int(parts[1]), int(parts[2])))
-            elif cmd == "PEN_UP":
-                if current_stroke:
-                    strokes.append(current_stroke)
-                current_stroke = []
+    with open(filename, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file, nothing to map
+            return strokes
+
+        with data:
+            # findall yields plain tuples (all b"" for PEN_UP), skipping a match
+            # object per line; MOVE is by far the most common command
+            for cmd, x, y in PEN_LINE_RE.findall(data):
+                if cmd == b"M":
+                    if current_stroke:
+                        current_stroke.append((int(x), int(y)))
+                elif cmd == b"D":
+                    current_stroke = [(int(x), int(y))]
+                else:
+                    if current_stroke:
+                        strokes.append(current_stroke)
+                    current_stroke = []
 
     return strokes
 
 
+# Strokes at least this long go through the Numba kernels when numba is installed;
+# below it the array conversion costs more than the JIT saves
+JIT_MIN_POINTS = 256
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _interpolate_kernel(xs, ys, factor):
+        n = xs.shape[0]
+        out_x = np.empty((n - 1) * factor + 1, np.int64)
+        out_y = np.empty((n - 1) * factor + 1, np.int64)
+        k = 0
+        for i in range(n - 1):
+            x1 = xs[i]
+            y1 = ys[i]
+            dx = xs[i + 1] - x1
+            dy = ys[i + 1] - y1
+            out_x[k] = x1
+            out_y[k] = y1
+            k += 1
+            for j in range(1, factor):
+                t = j / factor
+                out_x[k] = int(x1 + t * dx)
+                out_y[k] = int(y1 + t * dy)
+                k += 1
+        out_x[k] = xs[n - 1]
+        out_y[k] = ys[n - 1]
+        return out_x, out_y
+
+    @njit(cache=True)
+    def _smooth_kernel(xs, ys, window):
+        n = xs.shape[0]
+        half = window // 2
+        cum_x = np.zeros(n + 1, np.int64)
+        cum_y = np.zeros(n + 1, np.int64)
+        for i in range(n):
+            cum_x[i + 1] = cum_x[i] + xs[i]
+            cum_y[i + 1] = cum_y[i] + ys[i]
+
+        out_x = xs.copy()
+        out_y = ys.copy()
+        for i in range(1, n - 1):
+            start = max(0, i - half)
+            end = min(n, i + half + 1)
+            out_x[i] = int((cum_x[end] - cum_x[start]) / (end - start))
+            out_y[i] = int((cum_y[end] - cum_y[start]) / (end - start))
+        return out_x, out_y
+
+
+def _run_kernel(kernel, stroke, arg):
+    """Run a Numba kernel over a stroke and convert back to (x, y) tuples"""
+    points = np.array(stroke, dtype=np.int64)
+    xs, ys = kernel(points[:, 0].copy(), points[:, 1].copy(), arg)
+    return list(zip(xs.tolist(), ys.tolist()))
+
+
 def interpolate_stroke(stroke, factor):
     """Add interpolated points between stroke points"""
     if factor <= 1 or len(stroke) < 2:
         return stroke
 
-    result = []
-    for i in range(len(stroke) - 1):
-        x1, y1 = stroke[i]
-        x2, y2 = stroke[i + 1]
+    if njit is not None and len(stroke) >= JIT_MIN_POINTS:
+        return _run_kernel(_interpolate_kernel, stroke, factor)
 
-        result.append((x1, y1))
+    # Interpolation steps are the same for every segment, so compute them once
+    steps = [j / factor for j in range(1, factor)]
 
-        for j in range(1, factor):
-            t = j / factor
-            x = int(x1 + t * (x2 - x1))
-            y = int(y1 + t * (y2 - y1))
-            result.append((x, y))
+    result = []
+    append = result.append
+    extend = result.extend
+    for (x1, y1), (x2, y2) in zip(stroke, stroke[1:]):
+        dx = x2 - x1
+        dy = y2 - y1
+        append((x1, y1))
+        extend([(int(x1 + t * dx), int(y1 + t * dy)) for t in steps])
 
     result.append(stroke[-1])
     return result
@@ -75,14 +164,23 @@ def smooth_stroke(stroke, window=3):
     if len(stroke) < window or window < 2:
         return stroke
 
+    if njit is not None and len(stroke) >= JIT_MIN_POINTS:
+        return _run_kernel(_smooth_kernel, stroke, window)
+
+    # Prefix sums make every window sum two subtractions: O(N) regardless of window
+    cum_x = [0, *accumulate(p[0] for p in stroke)]
+    cum_y = [0, *accumulate(p[1] for p in stroke)]
+    n = len(stroke)
+    half = window // 2
+
     smoothed = [stroke[0]]
 
-    for i in range(1, len(stroke) - 1):
-        start = max(0, i - window // 2)
-        end = min(len(stroke), i + window // 2 + 1)
+    for i in range(1, n - 1):
+        start = max(0, i - half)
+        end = min(n, i + half + 1)
 
-        avg_x = sum(p[0] for p in stroke[start:end]) / (end - start)
-        avg_y = sum(p[1] for p in stroke[start:end]) / (end - start)
+        avg_x = (cum_x[end] - cum_x[start]) / (end - start)
+        avg_y = (cum_y[end] - cum_y[start]) / (end - start)
 
         smoothed.append((int(avg_x), int(avg_y)))
 
@@ -90,6 +188,60 @@ def smooth_stroke(stroke, window=3):
     return smoothed
 
 
+def _iter_interpolated(stroke, factor):
+    """Yield the points of interpolate_stroke(stroke, factor) one at a time"""
+    steps = [j / factor for j in range(1, factor)]
+    for (x1, y1), (x2, y2) in zip(stroke, stroke[1:]):
+        dx = x2 - x1
+        dy = y2 - y1
+        yield (x1, y1)
+        for t in steps:
+            yield (int(x1 + t * dx), int(y1 + t * dy))
+    yield stroke[-1]
+
+
+def interpolate_smooth_stroke(stroke, factor, window=3):
+    """smooth_stroke(interpolate_stroke(stroke, factor), window) in one pass
+
+    Interpolated points are streamed into a sliding window sum, so the
+    intermediate interpolated stroke is never materialized.
+    """
+    n = (len(stroke) - 1) * factor + 1
+    if (factor <= 1 or len(stroke) < 2 or window < 2 or n < window
+            or (njit is not None and len(stroke) >= JIT_MIN_POINTS)):
+        # Nothing to fuse, or the Numba kernels handle it faster separately
+        return smooth_stroke(interpolate_stroke(stroke, factor), window)
+
+    half = window // 2
+    points = _iter_interpolated(stroke, factor)
+    in_window = deque()
+    sum_x = sum_y = 0
+    end = 0
+
+    smoothed = [stroke[0]]
+
+    for i in range(1, n - 1):
+        new_end = min(n, i + half + 1)
+        while end < new_end:
+            x, y = next(points)
+            in_window.append((x, y))
+            sum_x += x
+            sum_y += y
+            end += 1
+
+        start = max(0, i - half)
+        while end - len(in_window) < start:
+            x, y = in_window.popleft()
+            sum_x -= x
+            sum_y -= y
+
+        count = len(in_window)
+        smoothed.append((int(sum_x / count), int(sum_y / count)))
+
+    smoothed.append(stroke[-1])
+    return smoothed
+
+
 def strokes_to_pen_commands(strokes):
     """Convert strokes back to PEN commands"""
     commands = []
@@ -99,13 +251,17 @@ def strokes_to_pen_commands(strokes):
             continue
 
         commands.append(f"PEN_DOWN {stroke[0][0]} {stroke[0][1]}")
-        for x, y in stroke[1:]:
-            commands.append(f"PEN_MOVE {x} {y}")
+        commands.extend([f"PEN_MOVE {x} {y}" for x, y in islice(stroke, 1, None)])
         commands.append("PEN_UP")
 
     return commands
 
 
+def json_parse_literal(json_text):
+    """Quote JSON text as a JS string for JSON.parse(), safe inside <script>"""
+    return json.dumps(json_text).replace('</', '<\\/')
+
+
 def generate_html_editor(strokes):
     """Generate HTML editor interface"""
 
@@ -126,462 +282,35 @@ def generate_html_editor(strokes):
         for stroke in strokes
     ])
 
-    html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <title>Stroke Editor</title>
-    <style>
-        body {{
-            font-family: 'Segoe UI', Arial, sans-serif;
-            margin: 0;
-            padding: 20px;
-            background: #f5f5f5;
-        }}
-        .container {{
-            max-width: 1400px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-            padding: 20px;
-        }}
-        h1 {{
-            margin: 0 0 20px 0;
-            color: #333;
-        }}
-        .editor {{
-            display: grid;
-            grid-template-columns: 1fr 300px;
-            gap: 20px;
-        }}
-        .canvas-container {{
-            border: 2px solid #ddd;
-            border-radius: 4px;
-            background: white;
-            position: relative;
-            overflow: auto;
-        }}
-        canvas {{
-            display: block;
-            cursor: crosshair;
-        }}
-        .controls {{
-            background: #f9f9f9;
-            border: 1px solid #ddd;
-            border-radius: 4px;
-            padding: 15px;
-        }}
-        .control-group {{
-            margin-bottom: 20px;
-        }}
-        .control-group h3 {{
-            margin: 0 0 10px 0;
-            font-size: 14px;
-            color: #666;
-            text-transform: uppercase;
-        }}
-        .stroke-list {{
-            max-height: 300px;
-            overflow-y: auto;
-            border: 1px solid #ddd;
-            border-radius: 4px;
-        }}
-        .stroke-item {{
-            padding: 8px;
-            border-bottom: 1px solid #eee;
-            cursor: pointer;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }}
-        .stroke-item:hover {{
-            background: #f0f0f0;
-        }}
-        .stroke-item.selected {{
-            background: #e3f2fd;
-        }}
-        .stroke-item.hidden {{
-            opacity: 0.3;
-        }}
-        label {{
-            display: block;
-            margin: 10px 0 5px 0;
-            font-size: 13px;
-            color: #555;
-        }}
-        input[type="range"] {{
-            width: 100%;
-        }}
-        .value {{
-            display: inline-block;
-            float: right;
-            font-weight: bold;
-            color: #333;
-        }}
-        button {{
-            width: 100%;
-            padding: 10px;
-            margin: 5px 0;
-            border: none;
-            border-radius: 4px;
-            background: #2196F3;
-            color: white;
-            cursor: pointer;
-            font-size: 14px;
-        }}
-        button:hover {{
-            background: #1976D2;
-        }}
-        button.secondary {{
-            background: #757575;
-        }}
-        button.secondary:hover {{
-            background: #616161;
-        }}
-        .stats {{
-            background: #f0f0f0;
-            padding: 10px;
-            border-radius: 4px;
-            font-size: 12px;
-            margin-top: 10px;
-        }}
-        .stats div {{
-            margin: 5px 0;
-        }}
-        .checkbox {{
-            display: inline-block;
-            margin-right: 5px;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>Stroke Editor</h1>
-        <div class="editor">
-            <div class="canvas-container">
-                <canvas id="canvas" width="1000" height="800"></canvas>
-            </div>
-            <div class="controls">
-                <div class="control-group">
-                    <h3>Strokes</h3>
-                    <div id="strokeList" class="stroke-list"></div>
-                </div>
-
-                <div class="control-group" id="strokeControls">
-                    <h3>Selected Stroke</h3>
-                    <label>
-                        Interpolation: <span class="value" id="interpValue">1x</span>
-                        <input type="range" id="interpSlider" min="1" max="30" value="1" />
-                    </label>
-                    <label>
-                        Smoothing: <span class="value" id="smoothValue">0</span>
-                        <input type="range" id="smoothSlider" min="0" max="10" value="0" />
-                    </label>
-                </div>
-
-                <div class="control-group">
-                    <h3>Global Settings</h3>
-                    <label>
-                        Apply to all: <span class="value" id="globalInterpValue">15x</span>
-                        <input type="range" id="globalInterp" min="1" max="30" value="15" />
-                    </label>
-                    <button onclick="applyGlobalInterpolation()">Apply Interpolation to All</button>
-                    <label>
-                        Global smoothing: <span class="value" id="globalSmoothValue">3</span>
-                        <input type="range" id="globalSmooth" min="0" max="10" value="3" />
-                    </label>
-                    <button onclick="applyGlobalSmoothing()">Apply Smoothing to All</button>
-                </div>
-
-                <div class="control-group">
-                    <h3>Actions</h3>
-                    <button onclick="resetAll()">Reset All Changes</button>
-                    <button onclick="exportCommands()" class="secondary">Export PEN Commands</button>
-                </div>
-
-                <div class="stats" id="stats">
-                    <div>Total strokes: <strong id="totalStrokes">0</strong></div>
-                    <div>Total points: <strong id="totalPoints">0</strong></div>
-                    <div>Selected points: <strong id="selectedPoints">0</strong></div>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        let strokes = {strokes_json};
-        let selectedStroke = 0;
-        let originalStrokes = JSON.parse(JSON.stringify(strokes));
-
-        const canvas = document.getElementById('canvas');
-        const ctx = canvas.getContext('2d');
-
-        const bounds = {{
-            minX: {min_x},
-            maxX: {max_x},
-            minY: {min_y},
-            maxY: {max_y}
-        }};
-
-        function wacomToCanvas(wx, wy) {{
-            const padding = 50;
-            const scaleX = (canvas.width - 2 * padding) / (bounds.maxX - bounds.minX);
-            const scaleY = (canvas.height - 2 * padding) / (bounds.maxY - bounds.minY);
-            const scale = Math.min(scaleX, scaleY);
-
-            const cx = padding + (wx - bounds.minX) * scale;
-            const cy = padding + (wy - bounds.minY) * scale;
-            return [cx, cy];
-        }}
-
-        function interpolateStroke(points, factor) {{
-            if (factor <= 1 || points.length < 2) return points;
-
-            const result = [];
-            for (let i = 0; i < points.length - 1; i++) {{
-                const [x1, y1] = points[i];
-                const [x2, y2] = points[i + 1];
-
-                result.push([x1, y1]);
-
-                for (let j = 1; j < factor; j++) {{
-                    const t = j / factor;
-                    const x = Math.round(x1 + t * (x2 - x1));
-                    const y = Math.round(y1 + t * (y2 - y1));
-                    result.push([x, y]);
-                }}
-            }}
-            result.push(points[points.length - 1]);
-            return result;
-        }}
-
-        function smoothStroke(points, window) {{
-            if (points.length < window || window < 2) return points;
-
-            const smoothed = [points[0]];
-
-            for (let i = 1; i < points.length - 1; i++) {{
-                const start = Math.max(0, i - Math.floor(window / 2));
-                const end = Math.min(points.length, i + Math.floor(window / 2) + 1);
-
-                let sumX = 0, sumY = 0;
-                for (let j = start; j < end; j++) {{
-                    sumX += points[j][0];
-                    sumY += points[j][1];
-                }}
-
-                const avgX = Math.round(sumX / (end - start));
-                const avgY = Math.round(sumY / (end - start));
-                smoothed.push([avgX, avgY]);
-            }}
-
-            smoothed.push(points[points.length - 1]);
-            return smoothed;
-        }}
-
-        function getProcessedStroke(stroke) {{
-            let points = stroke.points;
-            points = interpolateStroke(points, stroke.interpolation);
-            points = smoothStroke(points, stroke.smoothing);
-            return points;
-        }}
-
-        function drawStrokes() {{
-            ctx.clearRect(0, 0, canvas.width, canvas.height);
-
-            // Draw grid
-            ctx.strokeStyle = '#f0f0f0';
-            ctx.lineWidth = 1;
-            for (let i = 0; i < canvas.width; i += 50) {{
-                ctx.beginPath();
-                ctx.moveTo(i, 0);
-                ctx.lineTo(i, canvas.height);
-                ctx.stroke();
-            }}
-            for (let i = 0; i < canvas.height; i += 50) {{
-                ctx.beginPath();
-                ctx.moveTo(0, i);
-                ctx.lineTo(canvas.width, i);
-                ctx.stroke();
-            }}
-
-            // Draw strokes
-            strokes.forEach((stroke, idx) => {{
-                if (!stroke.selected) return;
-
-                const points = getProcessedStroke(stroke);
-                if (points.length < 2) return;
-
-                ctx.beginPath();
-                const [x0, y0] = wacomToCanvas(points[0][0], points[0][1]);
-                ctx.moveTo(x0, y0);
-
-                for (let i = 1; i < points.length; i++) {{
-                    const [x, y] = wacomToCanvas(points[i][0], points[i][1]);
-                    ctx.lineTo(x, y);
-                }}
-
-                ctx.strokeStyle = idx === selectedStroke ? '#2196F3' : '#333';
-                ctx.lineWidth = idx === selectedStroke ? 3 : 2;
-                ctx.lineCap = 'round';
-                ctx.lineJoin = 'round';
-                ctx.stroke();
-
-                // Draw points for selected stroke
-                if (idx === selectedStroke) {{
-                    points.forEach(([wx, wy]) => {{
-                        const [cx, cy] = wacomToCanvas(wx, wy);
-                        ctx.fillStyle = '#2196F3';
-                        ctx.beginPath();
-                        ctx.arc(cx, cy, 2, 0, 2 * Math.PI);
-                        ctx.fill();
-                    }});
-                }}
-            }});
-
-            updateStats();
-        }}
-
-        function updateStrokeList() {{
-            const list = document.getElementById('strokeList');
-            list.innerHTML = '';
-
-            strokes.forEach((stroke, idx) => {{
-                const div = document.createElement('div');
-                div.className = 'stroke-item' +
-                    (idx === selectedStroke ? ' selected' : '') +
-                    (!stroke.selected ? ' hidden' : '');
-
-                const points = getProcessedStroke(stroke);
-                div.innerHTML = `
-                    <span>
-                        <input type="checkbox" class="checkbox"
-                            ${{stroke.selected ? 'checked' : ''}}
-                            onchange="toggleStroke(${{idx}})" />
-                        Stroke ${{idx + 1}}
-                    </span>
-                    <span>${{points.length}} pts</span>
-                `;
-                div.onclick = (e) => {{
-                    if (e.target.type !== 'checkbox') selectStroke(idx);
-                }};
-                list.appendChild(div);
-            }});
-        }}
-
-        function selectStroke(idx) {{
-            selectedStroke = idx;
-            const stroke = strokes[idx];
-
-            document.getElementById('interpSlider').value = stroke.interpolation;
-            document.getElementById('interpValue').textContent = stroke.interpolation + 'x';
-            document.getElementById('smoothSlider').value = stroke.smoothing;
-            document.getElementById('smoothValue').textContent = stroke.smoothing;
-
-            updateStrokeList();
-            drawStrokes();
-        }}
-
-        function toggleStroke(idx) {{
-            strokes[idx].selected = !strokes[idx].selected;
-            updateStrokeList();
-            drawStrokes();
-        }}
-
-        function updateStats() {{
-            const totalStrokes = strokes.filter(s => s.selected).length;
-            const totalPoints = strokes.filter(s => s.selected)
-                .reduce((sum, s) => sum + getProcessedStroke(s).length, 0);
-            const selectedPoints = getProcessedStroke(strokes[selectedStroke]).length;
-
-            document.getElementById('totalStrokes').textContent = totalStrokes;
-            document.getElementById('totalPoints').textContent = totalPoints;
-            document.getElementById('selectedPoints').textContent = selectedPoints;
-        }}
-
-        function applyGlobalInterpolation() {{
-            const factor = parseInt(document.getElementById('globalInterp').value);
-            strokes.forEach(s => s.interpolation = factor);
-            selectStroke(selectedStroke);  // Refresh UI
-        }}
-
-        function applyGlobalSmoothing() {{
-            const window = parseInt(document.getElementById('globalSmooth').value);
-            strokes.forEach(s => s.smoothing = window);
-            selectStroke(selectedStroke);  // Refresh UI
-        }}
-
-        function resetAll() {{
-            strokes = JSON.parse(JSON.stringify(originalStrokes));
-            selectStroke(0);
-        }}
-
-        function exportCommands() {{
-            const commands = [];
-            strokes.forEach(stroke => {{
-                if (!stroke.selected) return;
-
-                const points = getProcessedStroke(stroke);
-                if (points.length < 1) return;
-
-                commands.push(`PEN_DOWN ${{points[0][0]}} ${{points[0][1]}}`);
-                for (let i = 1; i < points.length; i++) {{
-                    commands.push(`PEN_MOVE ${{points[i][0]}} ${{points[i][1]}}`);
-                }}
-                commands.push('PEN_UP');
-            }});
-
-            const blob = new Blob([commands.join('\\n') + '\\n'], {{type: 'text/plain'}});
-            const url = URL.createObjectURL(blob);
-            const a = document.createElement('a');
-            a.href = url;
-            a.download = 'edited_strokes.txt';
-            a.click();
-            URL.revokeObjectURL(url);
-        }}
-
-        // Event listeners
-        document.getElementById('interpSlider').oninput = function() {{
-            const val = parseInt(this.value);
-            document.getElementById('interpValue').textContent = val + 'x';
-            strokes[selectedStroke].interpolation = val;
-            drawStrokes();
-        }};
-
-        document.getElementById('smoothSlider').oninput = function() {{
-            const val = parseInt(this.value);
-            document.getElementById('smoothValue').textContent = val;
-            strokes[selectedStroke].smoothing = val;
-            drawStrokes();
-        }};
-
-        document.getElementById('globalInterp').oninput = function() {{
-            document.getElementById('globalInterpValue').textContent = this.value + 'x';
-        }};
-
-        document.getElementById('globalSmooth').oninput = function() {{
-            document.getElementById('globalSmoothValue').textContent = this.value;
-        }};
-
-        // Initialize
-        selectStroke(0);
-    </script>
-</body>
-</html>
-"""
-    return html
+    return HTML_TEMPLATE.substitute(
+        strokes_json=json_parse_literal(strokes_json),
+        min_x=min_x,
+        max_x=max_x,
+        min_y=min_y,
+        max_y=max_y,
+    )
 
 
 class EditorHandler(http.server.SimpleHTTPRequestHandler):
-    html_content = None
+    protocol_version = 'HTTP/1.1'  # Keep-alive; every response sets Content-Length
+    disable_nagle_algorithm = True  # Send the small response without Nagle delay
+    html_bytes = None  # Encoded once in main(), served as-is on every request
+    html_gzip = None  # Same page gzip-compressed once in main()
 
     def do_GET(self):
         if self.path == '/' or self.path == '/index.html':
+            body = self.html_bytes
+            gzip_ok = 'gzip' in self.headers.get('Accept-Encoding', '')
+            if gzip_ok:
+                body = self.html_gzip
             self.send_response(200)
-            self.send_header('Content-type', 'text/html')
+            self.send_header('Content-type', 'text/html; charset=utf-8')
+            if gzip_ok:
+                self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Vary', 'Accept-Encoding')
+            self.send_header('Content-Length', str(len(body)))
             self.end_headers()
-            self.wfile.write(self.html_content.encode())
+            self.wfile.write(body)
         else:
             self.send_error(404)
 
@@ -623,33 +352,31 @@ def main():
     print("Generating editor interface...")
 
     html = generate_html_editor(strokes)
-    EditorHandler.html_content = html
+    EditorHandler.html_bytes = html.encode('utf-8')
+    EditorHandler.html_gzip = gzip.compress(EditorHandler.html_bytes, compresslevel=9)
 
     port = 8000
-    print(f"Starting editor on http://localhost:{port}")
+    print(f"Starting editor on http://127.0.0.1:{port}")
     print()
     print("Opening browser...")
 
-    # Start server in thread
-    server = socketserver.TCPServer(("", port), EditorHandler)
-    server_thread = threading.Thread(target=server.serve_forever)
-    server_thread.daemon = True
-    server_thread.start()
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), EditorHandler)
 
-    # Open browser
-    webbrowser.open(f'http://localhost:{port}')
+    # Open browser once serve_forever() below is accepting connections
+    threading.Timer(0.3, webbrowser.open, args=(f'http://127.0.0.1:{port}',)).start()
 
     print()
     print("Editor running. Press Ctrl+C to stop.")
     print()
 
+    # Serve on the main thread until Ctrl+C
     try:
-        while True:
-            pass
+        server.serve_forever()
     except KeyboardInterrupt:
         print()
         print("Shutting down...")
-        server.shutdown()
+    finally:
+        server.server_close()
 
     return 0
 
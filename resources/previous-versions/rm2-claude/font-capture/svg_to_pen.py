@@ -15,6 +15,13 @@ import re
 import xml.etree.ElementTree as ET
 from pathlib import Path
 import argparse
+from functools import lru_cache
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:  # Optional: cubics are flattened in pure Python instead
+    njit = None
 
 # Wacom coordinate system (RM2 rotated 90°)
 WACOM_MAX_X = 20966
@@ -28,6 +35,100 @@ RM2_HEIGHT = 1872
 SVG_WIDTH = 1404
 SVG_HEIGHT = 1872
 
+# SVG units -> Wacom units
+SVG_TO_WACOM_X = WACOM_MAX_X / SVG_WIDTH
+SVG_TO_WACOM_Y = WACOM_MAX_Y / SVG_HEIGHT
+
+SVG_PATH_TAG = '{http://www.w3.org/2000/svg}path'
+
+# Path data tokens: a command letter or a number
+PATH_TOKEN_RE = re.compile(r'[MLHVCSQTAZmlhvcsqtaz]|[-+]?[0-9]*\.?[0-9]+')
+PATH_COMMANDS = 'MLHVCSQTAZmlhvcsqtaz'
+
+# Cubic Beziers are split until their control points are this close (taxicab
+# distance, SVG units) to a straight line: one Wacom unit, below which the
+# integer PEN coordinates cannot show the difference
+FLATNESS_TOLERANCE = 1.0 / max(SVG_TO_WACOM_X, SVG_TO_WACOM_Y)
+# Stop splitting after this many halvings (2**10 segments) whatever the curve
+MAX_SUBDIVISION_DEPTH = 10
+
+
+@lru_cache(maxsize=None)
+def quadratic_weights(steps):
+    """Bernstein weights of a quadratic Bezier sampled at t = 1/steps .. 1."""
+    weights = []
+    for i in range(1, steps + 1):
+        t = i / steps
+        mt = 1 - t
+        weights.append((mt * mt, 2 * mt * t, t * t))
+    return tuple(weights)
+
+
+if njit is not None:
+    @lru_cache(maxsize=None)
+    def jit_buffers():
+        """Split stack and output scratch for _flatten_cubic, reused by every curve."""
+        return (np.empty((MAX_SUBDIVISION_DEPTH + 1, 9)),
+                np.empty((2 ** MAX_SUBDIVISION_DEPTH, 2)))
+
+    @njit(cache=True)
+    def _flatten_cubic(x0, y0, x1, y1, x2, y2, x3, y3, tolerance, max_depth, stack, out):
+        # Iterative SVGToPen.flatten_cubic_bezier: right halves wait on an
+        # explicit stack, so the same points come out in the same order.
+        # Returns the number of points written to out.
+        count = 0
+        top = 0
+        depth = 0
+        while True:
+            dx1 = 2 * x1 - x0 - x2
+            dy1 = 2 * y1 - y0 - y2
+            dx2 = 2 * x2 - x1 - x3
+            dy2 = 2 * y2 - y1 - y3
+            # Same as Python's max(), NaN included
+            deviation = abs(dx1) + abs(dy1)
+            deviation2 = abs(dx2) + abs(dy2)
+            if deviation2 > deviation:
+                deviation = deviation2
+
+            if depth >= max_depth or deviation < tolerance:
+                out[count, 0] = x3
+                out[count, 1] = y3
+                count += 1
+                if top == 0:
+                    return count
+                top -= 1
+                x0, y0, x1, y1 = stack[top, 0], stack[top, 1], stack[top, 2], stack[top, 3]
+                x2, y2, x3, y3 = stack[top, 4], stack[top, 5], stack[top, 6], stack[top, 7]
+                depth = int(stack[top, 8])
+                continue
+
+            # de Casteljau split at t = 0.5; continue with the left half
+            x01 = (x0 + x1) / 2
+            y01 = (y0 + y1) / 2
+            x12 = (x1 + x2) / 2
+            y12 = (y1 + y2) / 2
+            x23 = (x2 + x3) / 2
+            y23 = (y2 + y3) / 2
+            x012 = (x01 + x12) / 2
+            y012 = (y01 + y12) / 2
+            x123 = (x12 + x23) / 2
+            y123 = (y12 + y23) / 2
+            xm = (x012 + x123) / 2
+            ym = (y012 + y123) / 2
+
+            depth += 1
+            stack[top, 0] = xm
+            stack[top, 1] = ym
+            stack[top, 2] = x123
+            stack[top, 3] = y123
+            stack[top, 4] = x23
+            stack[top, 5] = y23
+            stack[top, 6] = x3
+            stack[top, 7] = y3
+            stack[top, 8] = depth
+            top += 1
+            x1, y1, x2, y2, x3, y3 = x01, y01, x012, y012, xm, ym
+
 
 class SVGToPen:
     def __init__(self, add_delays=True):
@@ -51,212 +152,252 @@ class SVGToPen:
         """
         # Direct mapping: SVG portrait → PEN portrait coordinates
         # Scale SVG (1404x1872) to fit within Wacom space considering transform
-        pen_x = int(round((svg_x / SVG_WIDTH) * WACOM_MAX_X))
-        pen_y = int(round((svg_y / SVG_HEIGHT) * WACOM_MAX_Y))
+        pen_x = round(svg_x * SVG_TO_WACOM_X)
+        pen_y = round(svg_y * SVG_TO_WACOM_Y)
 
         return pen_x, pen_y
 
+    def svg_points_to_wacom(self, points):
+        """Convert a whole list of SVG points, as svg_to_wacom does per point.
+
+        One comprehension instead of a method call per point; round() of a
+        float already returns an int.
+        """
+        return [(round(x * SVG_TO_WACOM_X), round(y * SVG_TO_WACOM_Y)) for x, y in points]
+
     def parse_path_data(self, path_data):
-        """Parse SVG path data (M/L commands) into points."""
-        points = []
+        """Parse SVG path data into points.
 
-        # Remove extra whitespace and normalize
-        path_data = re.sub(r'\s+', ' ', path_data.strip())
+        Each command letter hands its run of numbers to a loop specific to
+        that command and its absolute/relative form, so the command is not
+        re-tested for every coordinate.
+        """
+        points = []
 
-        # Split into commands
-        tokens = re.findall(r'[MLHVCSQTAZmlhvcsqtaz]|[-+]?[0-9]*\.?[0-9]+', path_data)
+        # Split into commands and numbers (whitespace and commas are skipped)
+        tokens = PATH_TOKEN_RE.findall(path_data)
+        count = len(tokens)
 
         i = 0
         current_x, current_y = 0, 0
-        command = None
-
-        while i < len(tokens):
-            token = tokens[i]
-
-            # Check if it's a command letter
-            if token in 'MLHVCSQTAZmlhvcsqtaz':
-                command = token
-                i += 1
-                continue
 
-            # Parse based on current command
-            if command in ['M', 'm']:  # MoveTo
-                x = float(token)
-                y = float(tokens[i + 1])
-                if command == 'm':  # Relative
-                    x += current_x
-                    y += current_y
-                current_x, current_y = x, y
-                points.append((x, y))
-                i += 2
-                # After M, implicit L commands
-                command = 'L' if command == 'M' else 'l'
-
-            elif command in ['L', 'l']:  # LineTo
-                x = float(token)
-                y = float(tokens[i + 1])
-                if command == 'l':  # Relative
-                    x += current_x
-                    y += current_y
-                current_x, current_y = x, y
-                points.append((x, y))
-                i += 2
-
-            elif command in ['H', 'h']:  # Horizontal line
-                x = float(token)
-                if command == 'h':  # Relative
-                    x += current_x
-                current_x = x
-                points.append((current_x, current_y))
-                i += 1
-
-            elif command in ['V', 'v']:  # Vertical line
-                y = float(token)
-                if command == 'v':  # Relative
-                    y += current_y
-                current_y = y
-                points.append((current_x, current_y))
-                i += 1
-
-            elif command in ['C', 'c']:  # Cubic Bezier
-                # C x1 y1 x2 y2 x y
-                x1 = float(token)
-                y1 = float(tokens[i + 1])
-                x2 = float(tokens[i + 2])
-                y2 = float(tokens[i + 3])
-                x = float(tokens[i + 4])
-                y = float(tokens[i + 5])
-
-                if command == 'c':  # Relative
-                    x1 += current_x
-                    y1 += current_y
-                    x2 += current_x
-                    y2 += current_y
-                    x += current_x
-                    y += current_y
-
-                # Sample the bezier curve
-                curve_points = self.sample_cubic_bezier(
-                    current_x, current_y, x1, y1, x2, y2, x, y
-                )
-                points.extend(curve_points)
-                current_x, current_y = x, y
-                i += 6
-
-            elif command in ['S', 's']:  # Smooth cubic Bezier
-                # S x2 y2 x y
-                x2 = float(token)
-                y2 = float(tokens[i + 1])
-                x = float(tokens[i + 2])
-                y = float(tokens[i + 3])
-
-                if command == 's':  # Relative
-                    x2 += current_x
-                    y2 += current_y
-                    x += current_x
-                    y += current_y
-
-                # First control point is reflection of previous
-                # For simplicity, use current point
-                x1, y1 = current_x, current_y
-
-                curve_points = self.sample_cubic_bezier(
-                    current_x, current_y, x1, y1, x2, y2, x, y
-                )
-                points.extend(curve_points)
-                current_x, current_y = x, y
-                i += 4
-
-            elif command in ['Q', 'q']:  # Quadratic Bezier
-                # Q x1 y1 x y
-                x1 = float(token)
-                y1 = float(tokens[i + 1])
-                x = float(tokens[i + 2])
-                y = float(tokens[i + 3])
-
-                if command == 'q':  # Relative
-                    x1 += current_x
-                    y1 += current_y
-                    x += current_x
-                    y += current_y
-
-                curve_points = self.sample_quadratic_bezier(
-                    current_x, current_y, x1, y1, x, y
-                )
-                points.extend(curve_points)
-                current_x, current_y = x, y
-                i += 4
-
-            elif command in ['Z', 'z']:  # Close path
-                # Could optionally add line back to first point
-                i += 1
+        while i < count:
+            command = tokens[i]
+            i += 1
+
+            if command in 'ML':  # MoveTo (then implicit LineTo) / LineTo
+                while i < count and tokens[i] not in PATH_COMMANDS:
+                    current_x = float(tokens[i])
+                    current_y = float(tokens[i + 1])
+                    points.append((current_x, current_y))
+                    i += 2
+
+            elif command in 'ml':  # Relative
+                while i < count and tokens[i] not in PATH_COMMANDS:
+                    current_x += float(tokens[i])
+                    current_y += float(tokens[i + 1])
+                    points.append((current_x, current_y))
+                    i += 2
+
+            elif command == 'H':  # Horizontal line
+                while i < count and tokens[i] not in PATH_COMMANDS:
+                    current_x = float(tokens[i])
+                    points.append((current_x, current_y))
+                    i += 1
+
+            elif command == 'h':
+                while i < count and tokens[i] not in PATH_COMMANDS:
+                    current_x += float(tokens[i])
+                    points.append((current_x, current_y))
+                    i += 1
+
+            elif command == 'V':  # Vertical line
+                while i < count and tokens[i] not in PATH_COMMANDS:
+                    current_y = float(tokens[i])
+                    points.append((current_x, current_y))
+                    i += 1
+
+            elif command == 'v':
+                while i < count and tokens[i] not in PATH_COMMANDS:
+                    current_y += float(tokens[i])
+                    points.append((current_x, current_y))
+                    i += 1
+
+            elif command in 'Cc':  # Cubic Bezier: x1 y1 x2 y2 x y
+                relative = command == 'c'
+                while i < count and tokens[i] not in PATH_COMMANDS:
+                    x1 = float(tokens[i])
+                    y1 = float(tokens[i + 1])
+                    x2 = float(tokens[i + 2])
+                    y2 = float(tokens[i + 3])
+                    x = float(tokens[i + 4])
+                    y = float(tokens[i + 5])
+                    if relative:
+                        x1 += current_x
+                        y1 += current_y
+                        x2 += current_x
+                        y2 += current_y
+                        x += current_x
+                        y += current_y
+
+                    self.flatten_cubic_bezier(
+                        current_x, current_y, x1, y1, x2, y2, x, y, points
+                    )
+                    current_x, current_y = x, y
+                    i += 6
+
+            elif command in 'Ss':  # Smooth cubic Bezier: x2 y2 x y
+                relative = command == 's'
+                while i < count and tokens[i] not in PATH_COMMANDS:
+                    x2 = float(tokens[i])
+                    y2 = float(tokens[i + 1])
+                    x = float(tokens[i + 2])
+                    y = float(tokens[i + 3])
+                    if relative:
+                        x2 += current_x
+                        y2 += current_y
+                        x += current_x
+                        y += current_y
+
+                    # First control point is reflection of previous
+                    # For simplicity, use current point
+                    self.flatten_cubic_bezier(
+                        current_x, current_y, current_x, current_y, x2, y2, x, y, points
+                    )
+                    current_x, current_y = x, y
+                    i += 4
+
+            elif command in 'Qq':  # Quadratic Bezier: x1 y1 x y
+                relative = command == 'q'
+                while i < count and tokens[i] not in PATH_COMMANDS:
+                    x1 = float(tokens[i])
+                    y1 = float(tokens[i + 1])
+                    x = float(tokens[i + 2])
+                    y = float(tokens[i + 3])
+                    if relative:
+                        x1 += current_x
+                        y1 += current_y
+                        x += current_x
+                        y += current_y
+
+                    points.extend(self.sample_quadratic_bezier(
+                        current_x, current_y, x1, y1, x, y
+                    ))
+                    current_x, current_y = x, y
+                    i += 4
 
             else:
-                # Unknown command, skip
-                i += 1
+                # Close path (could optionally add line back to first point),
+                # unsupported T/A, or numbers before the first command: skip
+                # up to the next command
+                while i < count and tokens[i] not in PATH_COMMANDS:
+                    i += 1
 
         return points
 
-    def sample_cubic_bezier(self, x0, y0, x1, y1, x2, y2, x3, y3, steps=20):
-        """Sample a cubic Bezier curve into line segments."""
-        points = []
-        for i in range(1, steps + 1):
-            t = i / steps
-            t2 = t * t
-            t3 = t2 * t
-            mt = 1 - t
-            mt2 = mt * mt
-            mt3 = mt2 * mt
-
-            x = mt3 * x0 + 3 * mt2 * t * x1 + 3 * mt * t2 * x2 + t3 * x3
-            y = mt3 * y0 + 3 * mt2 * t * y1 + 3 * mt * t2 * y2 + t3 * y3
-            points.append((x, y))
+    def is_straight_cubic(self, x0, y0, x1, y1, x2, y2, x3, y3):
+        """True if a cubic Bezier is (within tolerance) its chord p0 -> p3.
 
-        return points
+        Both control points must lie within FLATNESS_TOLERANCE of the chord
+        line and project between its end points; the curve then stays on
+        the chord whatever the control points' spacing (e.g. p1 = p0 and
+        p2 = p3, as editors write straight segments).
+        """
+        ax = x3 - x0
+        ay = y3 - y0
+        length2 = ax * ax + ay * ay
+        limit = FLATNESS_TOLERANCE * FLATNESS_TOLERANCE * length2
+
+        for cx, cy in ((x1 - x0, y1 - y0), (x2 - x0, y2 - y0)):
+            cross = ax * cy - ay * cx
+            along = ax * cx + ay * cy
+            if not (cross * cross < limit and 0 <= along <= length2):
+                return False
+        return True
+
+    def flatten_cubic_bezier(self, x0, y0, x1, y1, x2, y2, x3, y3, points, depth=0):
+        """Append a cubic Bezier curve to points as line segments.
+
+        The curve is flat when both inner control points sit (nearly) where
+        evenly spaced points on the chord would; otherwise it is split in
+        half and each half flattened. Near-straight curves become a single
+        segment, tight ones get as many as they need.
+
+        A straight curve (is_straight_cubic) is one segment without splitting.
+        With numba installed the whole curve is flattened by _flatten_cubic.
+        """
+        if depth == 0 and self.is_straight_cubic(x0, y0, x1, y1, x2, y2, x3, y3):
+            points.append((x3, y3))
+            return
 
-    def sample_quadratic_bezier(self, x0, y0, x1, y1, x2, y2, steps=15):
-        """Sample a quadratic Bezier curve into line segments."""
-        points = []
-        for i in range(1, steps + 1):
-            t = i / steps
-            t2 = t * t
-            mt = 1 - t
-            mt2 = mt * mt
+        if njit is not None and depth == 0:
+            stack, out = jit_buffers()
+            count = _flatten_cubic(x0, y0, x1, y1, x2, y2, x3, y3,
+                                   FLATNESS_TOLERANCE, MAX_SUBDIVISION_DEPTH, stack, out)
+            points.extend(zip(out[:count, 0].tolist(), out[:count, 1].tolist()))
+            return
 
-            x = mt2 * x0 + 2 * mt * t * x1 + t2 * x2
-            y = mt2 * y0 + 2 * mt * t * y1 + t2 * y2
-            points.append((x, y))
+        # Deviation of p1 and p2 from even spacing along p0 -> p3
+        dx1 = 2 * x1 - x0 - x2
+        dy1 = 2 * y1 - y0 - y2
+        dx2 = 2 * x2 - x1 - x3
+        dy2 = 2 * y2 - y1 - y3
 
-        return points
+        if (depth >= MAX_SUBDIVISION_DEPTH or
+                max(abs(dx1) + abs(dy1), abs(dx2) + abs(dy2)) < FLATNESS_TOLERANCE):
+            points.append((x3, y3))
+            return
+
+        # de Casteljau split at t = 0.5
+        x01 = (x0 + x1) / 2
+        y01 = (y0 + y1) / 2
+        x12 = (x1 + x2) / 2
+        y12 = (y1 + y2) / 2
+        x23 = (x2 + x3) / 2
+        y23 = (y2 + y3) / 2
+        x012 = (x01 + x12) / 2
+        y012 = (y01 + y12) / 2
+        x123 = (x12 + x23) / 2
+        y123 = (y12 + y23) / 2
+        xm = (x012 + x123) / 2
+        ym = (y012 + y123) / 2
+
+        self.flatten_cubic_bezier(x0, y0, x01, y01, x012, y012, xm, ym, points, depth + 1)
+        self.flatten_cubic_bezier(xm, ym, x123, y123, x23, y23, x3, y3, points, depth + 1)
+
+    def sample_quadratic_bezier(self, x0, y0, x1, y1, x2, y2, steps=15):
+        """Sample a quadratic Bezier curve into line segments."""
+        return [(a * x0 + b * x1 + c * x2, a * y0 + b * y1 + c * y2)
+                for a, b, c in quadratic_weights(steps)]
 
     def parse_svg_file(self, filepath):
         """Parse SVG file and extract path data."""
         print(f"[INFO] Reading SVG from: {filepath}")
 
-        # Parse with namespaces
-        namespaces = {
-            'svg': 'http://www.w3.org/2000/svg',
-            'inkscape': 'http://www.inkscape.org/namespaces/inkscape'
-        }
-
-        tree = ET.parse(filepath)
-        root = tree.getroot()
-
-        # Find all path elements
-        paths = root.findall('.//svg:path', namespaces)
+        # Collect (d, id) of all path elements in one streaming pass,
+        # clearing each once read
+        svg_paths = []
+        plain_paths = []
+        for _, elem in ET.iterparse(filepath):
+            if elem.tag == SVG_PATH_TAG:
+                svg_paths.append((elem.get('d', ''), elem.get('id')))
+            elif elem.tag == 'path':
+                plain_paths.append((elem.get('d', ''), elem.get('id')))
+            else:
+                continue
+            elem.clear()
 
-        if not paths:
-            # Try without namespace
-            paths = root.findall('.//path')
+        # Paths without namespace only count if there are no SVG ones
+        paths = svg_paths or plain_paths
 
         print(f"[INFO] Found {len(paths)} paths")
 
-        for path_idx, path in enumerate(paths):
-            path_data = path.get('d', '')
+        for path_idx, (path_data, path_id) in enumerate(paths):
             if not path_data:
                 continue
 
-            path_id = path.get('id', f'path_{path_idx}')
+            if path_id is None:
+                path_id = f'path_{path_idx}'
             print(f"[INFO] Processing {path_id}")
 
             # Parse path data into points
@@ -267,7 +408,7 @@ class SVGToPen:
                 continue
 
             # Convert to Wacom coordinates
-            wacom_points = [self.svg_to_wacom(x, y) for x, y in svg_points]
+            wacom_points = self.svg_points_to_wacom(svg_points)
 
             # Calculate stroke metadata for ordering
             metadata = self.calculate_stroke_metadata(wacom_points, path_id)
@@ -447,11 +588,10 @@ class SVGToPen:
                         delay_count += 1
 
             # Generate stroke commands
-            for point_idx, (wx, wy) in enumerate(stroke):
-                if point_idx == 0:
-                    lines.append(f"PEN_DOWN {wx} {wy}")
-                else:
-                    lines.append(f"PEN_MOVE {wx} {wy}")
+            if stroke:
+                wx, wy = stroke[0]
+                lines.append(f"PEN_DOWN {wx} {wy}")
+                lines.extend([f"PEN_MOVE {wx} {wy}" for wx, wy in stroke[1:]])
 
             lines.append("PEN_UP")
 
@@ -11,8 +11,13 @@ Usage:
     python text_to_pen.py --file essay.txt --pages essay_page{}.txt
 """
 
+import os
 import sys
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import cycle, repeat
+from operator import add
 from pathlib import Path
 
 # Wacom coordinate system (RM2)
@@ -188,79 +193,232 @@ FONT = {
 }
 
 
+def compile_glyph(strokes, delta=False):
+    """Compile one character's strokes into (template, offsets, command_count).
+
+    The template holds the character's PEN command lines as bytes with %d
+    placeholders and offsets the matching x, y offsets interleaved, so a
+    character is rendered by a single % format. Strokes with fewer than two
+    points can't be drawn and are dropped.
+
+    With delta, points after each PEN_DOWN are PEN_DELTA dx dy lines. Those
+    don't depend on where the character is drawn, so they go into the
+    template as literals and only stroke starts remain as offsets.
+    """
+    lines = []
+    offsets = []
+    for stroke in strokes:
+        if len(stroke) < 2:
+            continue
+        lines.append(b"PEN_DOWN %d %d\n")
+        if delta:
+            offsets += stroke[0]
+            lines.extend([b"PEN_DELTA %d %d\n" % (x2 - x1, y2 - y1)
+                          for (x1, y1), (x2, y2) in zip(stroke, stroke[1:])])
+        else:
+            lines.extend([b"PEN_MOVE %d %d\n"] * (len(stroke) - 1))
+            for px, py in stroke:
+                offsets += (px, py)
+        lines.append(b"PEN_UP\n")
+    return b''.join(lines), tuple(offsets), len(lines)
+
+
+def compile_font(font, delta=False):
+    """Compile every character of a FONT-style table, see compile_glyph"""
+    return {char: compile_glyph(strokes, delta) for char, strokes in font.items()}
+
+
+# FONT compiled once at import time, with absolute PEN_MOVEs and with PEN_DELTAs;
+# this is what render_character reads
+GLYPHS = compile_font(FONT)
+DELTA_GLYPHS = compile_font(FONT, delta=True)
+
+# Every character without a glyph is translated to this one before layout. It
+# draws nothing but still takes up CHAR_WIDTH, like any unknown character
+UNKNOWN_CHAR = '\x00'
+GLYPHS[UNKNOWN_CHAR] = DELTA_GLYPHS[UNKNOWN_CHAR] = compile_glyph([])
+
+
+class _UnknownCharTable(dict):
+    """str.translate table sending characters without a glyph to UNKNOWN_CHAR.
+
+    Whitespace is kept so words still split the same way. Lookups are cached,
+    so each distinct character is only classified once.
+    """
+
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        result = codepoint if char in GLYPHS or char.isspace() else UNKNOWN_CHAR
+        self[codepoint] = result
+        return result
+
+
+UNKNOWN_CHAR_TABLE = _UnknownCharTable()
+
+
+# Shared pool of offset values for compiled words. Shifted offsets take a small
+# set of values, so interning them keeps one int object per value instead of
+# one per point in every cached word
+_OFFSET_POOL = {}
+
+
+@lru_cache(maxsize=4096)
+def compile_word(word, delta=False):
+    """Merge a word's glyphs into one (template, offsets, command_count).
+
+    Offsets are relative to the word's origin, with each character shifted
+    right by CHAR_WIDTH. Words repeat a lot in running text, so the cache
+    lets most words render with a single % format.
+    """
+    glyphs = DELTA_GLYPHS if delta else GLYPHS
+    templates = []
+    offsets = []
+    count = 0
+    intern = _OFFSET_POOL.setdefault
+    for i, char in enumerate(word):
+        glyph = glyphs.get(char)
+        if glyph is None or not glyph[2]:
+            continue
+        template, glyph_offsets, glyph_count = glyph
+        templates.append(template)
+        offsets.extend([intern(v, v) for v in map(add, glyph_offsets, cycle((i * CHAR_WIDTH, 0)))])
+        count += glyph_count
+    return b''.join(templates), tuple(offsets), count
+
+
 class TextToPen:
-    def __init__(self):
-        self.commands = []
+    def __init__(self, delta=False):
+        self.delta = delta  # Emit PEN_DELTA instead of PEN_MOVE within strokes
+        self.glyphs = DELTA_GLYPHS if delta else GLYPHS
+        self.buf = bytearray()  # Formatted PEN command lines, ready to write
+        self.command_count = 0
         self.current_x = MARGIN_LEFT
         self.current_y = MARGIN_TOP
 
     def render_character(self, char, x, y):
         """Render a single character at position (x, y)."""
-        if char not in FONT:
+        glyph = self.glyphs.get(char)
+        if glyph is None:
             # Unknown character - skip
             return
 
-        strokes = FONT[char]
-        for stroke in strokes:
-            if len(stroke) < 2:
-                continue
+        template, offsets, count = glyph
+        if not count:
+            return
 
-            # First point - PEN_DOWN
-            px, py = stroke[0]
-            wacom_x = x + px
-            wacom_y = y + py
-            self.commands.append(f"PEN_DOWN {wacom_x} {wacom_y}")
+        # Shift the interleaved offsets by (x, y) and format the whole glyph at once
+        self.buf += template % tuple(map(add, offsets, cycle((x, y))))
+        self.command_count += count
 
-            # Remaining points - PEN_MOVE
-            for px, py in stroke[1:]:
-                wacom_x = x + px
-                wacom_y = y + py
-                self.commands.append(f"PEN_MOVE {wacom_x} {wacom_y}")
+    def render_word(self, word, x, y):
+        """Render a word with its first character at (x, y)."""
+        template, offsets, count = compile_word(word, self.delta)
+        if not count:
+            return
 
-            # End stroke
-            self.commands.append("PEN_UP")
+        self.buf += template % tuple(map(add, offsets, cycle((x, y))))
+        self.command_count += count
 
-    def render_text(self, text):
-        """Render text with line wrapping."""
-        words = text.split()
+    def layout_text(self, text):
+        """Place words with line wrapping, without rendering anything.
+
+        Returns (placements, complete): the (word, x, y) of every word that
+        fits, and whether all of the text fit on the page.
+        """
+        # Collapsing unknown characters up front means words that differ only in
+        # those characters share one compile_word cache entry
+        return self.layout_words(text.translate(UNKNOWN_CHAR_TABLE).split())
+
+    def layout_words(self, words):
+        """Place an already split list of words, see layout_text."""
+        placements = []
+        place = placements.append
+
+        # Loop invariants and the cursor live in locals; the cursor is
+        # written back to self on the way out
+        right_edge = WACOM_MAX_X - MARGIN_RIGHT
+        bottom_edge = WACOM_MAX_Y - MARGIN_BOTTOM - CHAR_HEIGHT
+        x = self.current_x
+        y = self.current_y
+        complete = True
 
         for word in words:
             # Check if word fits on current line
             word_width = len(word) * CHAR_WIDTH + WORD_SPACING
-            if self.current_x + word_width > WACOM_MAX_X - MARGIN_RIGHT:
+            if x + word_width > right_edge:
                 # Move to next line
-                self.current_x = MARGIN_LEFT
-                self.current_y += LINE_SPACING
+                x = MARGIN_LEFT
+                y += LINE_SPACING
 
                 # Check if we're past bottom margin
-                if self.current_y + CHAR_HEIGHT > WACOM_MAX_Y - MARGIN_BOTTOM:
+                if y > bottom_edge:
                     # Page full - return incomplete
-                    return False
+                    complete = False
+                    break
 
-            # Render each character in word
-            for char in word:
-                self.render_character(char, self.current_x, self.current_y)
-                self.current_x += CHAR_WIDTH
+            place((word, x, y))
 
-            # Add word spacing
-            self.current_x += WORD_SPACING
+            # Advance past the word and its spacing
+            x += word_width
 
-        return True
+        self.current_x = x
+        self.current_y = y
+        return placements, complete
+
+    def render_text(self, text):
+        """Render text with line wrapping."""
+        placements, complete = self.layout_text(text)
+        for word, x, y in placements:
+            self.render_word(word, x, y)
+        return complete
 
     def save_to_file(self, filepath):
         """Save PEN commands to file."""
-        with open(filepath, 'w') as f:
-            f.write("# Generated by text_to_pen.py\n")
-            f.write("# Hershey single-stroke font\n\n")
-            f.write('\n'.join(self.commands))
-            f.write('\n')
+        with open(filepath, 'wb') as f:
+            f.write(b"# Generated by text_to_pen.py\n")
+            f.write(b"# Hershey single-stroke font\n\n")
+            f.write(self.buf or b"\n")
+
+
+def paginate(text):
+    """Split text into one chunk of words per page, using render_text's layout."""
+    words = text.split()
+    pages = []
+    while words:
+        placements, _ = TextToPen().layout_words(words)
+        pages.append(' '.join(words[:len(placements)]))
+        words = words[len(placements):]
+    return pages
+
+
+def render_page(text, delta=False):
+    """Render one page of text on a fresh TextToPen (runs in worker processes)."""
+    converter = TextToPen(delta)
+    converter.render_text(text)
+    return converter
+
+
+def render_pages(text, delta=False):
+    """Render text across as many pages as it needs, in parallel when there are several."""
+    pages = paginate(text)
+    workers = min(len(pages), os.cpu_count() or 1)
+    if workers <= 1:
+        return [render_page(page, delta) for page in pages]
+
+    # Pages are laid out independently, so each worker renders its own
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(render_page, pages, repeat(delta)))
 
 
 def main():
     parser = argparse.ArgumentParser(description='Convert text to PEN commands for RM2')
     parser.add_argument('text', nargs='?', help='Text to render (or use --file)')
-    parser.add_argument('output', help='Output PEN command file')
+    parser.add_argument('output', help='Output PEN command file (a pattern like page{}.txt with --pages)')
     parser.add_argument('--file', '-f', help='Read text from file')
+    parser.add_argument('--pages', action='store_true',
+                        help='Continue onto more pages instead of truncating; output is a {} pattern')
+    parser.add_argument('--delta', action='store_true',
+                        help='Write points after PEN_DOWN as relative PEN_DELTA dx dy commands')
 
     args = parser.parse_args()
 
@@ -273,14 +431,30 @@ def main():
     else:
         parser.error("Provide text or --file")
 
+    if args.pages:
+        if '{}' not in args.output:
+            parser.error("--pages needs an output pattern containing {}, e.g. essay_page{}.txt")
+
+        converters = render_pages(text, args.delta)
+        for page_no, converter in enumerate(converters, 1):
+            page_file = args.output.format(page_no)
+            converter.save_to_file(page_file)
+            print(f"[OK] Page {page_no}: {converter.command_count} PEN commands -> {page_file}")
+
+        print(f"[OK] Generated {len(converters)} page(s)")
+        print()
+        print("Next steps:")
+        print(f"  Test each page on RM2: ./send.sh {args.output.format(1)}")
+        return
+
     # Convert to PEN commands
-    converter = TextToPen()
+    converter = TextToPen(args.delta)
     success = converter.render_text(text)
 
     # Save output
     converter.save_to_file(args.output)
 
-    print(f"[OK] Generated {len(converter.commands)} PEN commands")
+    print(f"[OK] Generated {converter.command_count} PEN commands")
     print(f"[OK] Saved to: {args.output}")
 
     if not success:
@@ -289,7 +463,7 @@ def main():
     print()
     print("Next steps:")
     print(f"  1. Test on RM2: ./send.sh {args.output}")
-    print("  2. For multi-page documents, split text into pages first")
+    print("  2. For multi-page documents, use --pages with an output pattern like page{}.txt")
 
 
 if __name__ == '__main__':
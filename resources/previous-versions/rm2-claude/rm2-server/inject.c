@@ -30,10 +30,12 @@
 #define FIFO_PATH "/tmp/rm2_inject"
 #define MAX_QUEUE 10000
 
+// === TO_WACOM_BEGIN === (replaced by testing-tools/fix_transform.py)
 // Transformation #6: Swap X/Y + Flip Y (fixes mirroring/rotation issue)
 // PEN (x,y) -> Wacom: x_wacom = WACOM_MAX_Y - y, y_wacom = x
 static inline int to_wacom_x(int x, int y) { return WACOM_MAX_Y - y; }
 static inline int to_wacom_y(int x, int y) { return x; }
+// === TO_WACOM_END ===
 
 // Event creation
 static struct input_event make_event(__u16 type, __u16 code, __s32 value) {
@@ -110,6 +112,7 @@ static void* fifo_reader(void* arg) {
         char buf[4096];
         char leftover[256] = {0};
         ssize_t n;
+        int pen_x = 0, pen_y = 0;  // Last PEN position, base for PEN_DELTA
 
         while ((n = read(fd, buf, sizeof(buf) - 1)) > 0) {
             buf[n] = '\0';
@@ -133,6 +136,8 @@ static void* fifo_reader(void* arg) {
                     if (strcmp(cmd, "PEN_DOWN") == 0) {
                         int wx = to_wacom_x(x, y);
                         int wy = to_wacom_y(x, y);
+                        pen_x = x;
+                        pen_y = y;
 
                         enqueue(make_event(EV_KEY, BTN_TOOL_PEN, 1));
                         enqueue(make_event(EV_KEY, BTN_TOUCH, 1));
@@ -144,6 +149,20 @@ static void* fifo_reader(void* arg) {
                     } else if (strcmp(cmd, "PEN_MOVE") == 0) {
                         int wx = to_wacom_x(x, y);
                         int wy = to_wacom_y(x, y);
+                        pen_x = x;
+                        pen_y = y;
+
+                        enqueue(make_event(EV_ABS, ABS_X, wx));
+                        enqueue(make_event(EV_ABS, ABS_Y, wy));
+                        enqueue(make_event(EV_ABS, ABS_PRESSURE, 2000));
+                        enqueue(make_event(EV_SYN, SYN_REPORT, 0));
+
+                    } else if (strcmp(cmd, "PEN_DELTA") == 0) {
+                        // PEN_DELTA dx dy: PEN_MOVE relative to the previous point
+                        pen_x += x;
+                        pen_y += y;
+                        int wx = to_wacom_x(pen_x, pen_y);
+                        int wy = to_wacom_y(pen_x, pen_y);
 
                         enqueue(make_event(EV_ABS, ABS_X, wx));
                         enqueue(make_event(EV_ABS, ABS_Y, wy));
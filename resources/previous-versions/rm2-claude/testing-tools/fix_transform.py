@@ -12,67 +12,41 @@ Example:
     python fix_transform.py 5
 """
 
+import os
 import sys
-import re
 from pathlib import Path
+from string import Template
 
 
-# All 8 possible transformations
+# inject.c keeps its coordinate transform between these marker comments
+TO_WACOM_BEGIN = "// === TO_WACOM_BEGIN ==="
+TO_WACOM_END = "// === TO_WACOM_END ==="
+
+
+# All 8 possible transformations: name and the C expressions for the Wacom
+# x and y, in terms of the PEN command's x and y
 TRANSFORMATIONS = {
-    1: {
-        'name': 'Identity (no transform)',
-        'code': '''// PEN commands already use Wacom coordinates - pass through directly
-static inline int to_wacom_x(int x) { return x; }
-static inline int to_wacom_y(int y) { return y; }'''
-    },
-    2: {
-        'name': 'Flip horizontal',
-        'code': '''// Flip horizontal
-static inline int to_wacom_x(int x) { return WACOM_MAX_X - x; }
-static inline int to_wacom_y(int y) { return y; }'''
-    },
-    3: {
-        'name': 'Flip vertical',
-        'code': '''// Flip vertical
-static inline int to_wacom_x(int x) { return x; }
-static inline int to_wacom_y(int y) { return WACOM_MAX_Y - y; }'''
-    },
-    4: {
-        'name': 'Flip both (180° rotation)',
-        'code': '''// Flip both (180° rotation)
-static inline int to_wacom_x(int x) { return WACOM_MAX_X - x; }
-static inline int to_wacom_y(int y) { return WACOM_MAX_Y - y; }'''
-    },
-    5: {
-        'name': 'Swap X/Y (90° rotation)',
-        'code': '''// Swap X/Y (90° rotation)
-static inline int to_wacom_x(int x) { return y; }  // Note: takes original y
-static inline int to_wacom_y(int y) { return x; }  // Note: takes original x
-// WARNING: This requires passing both x and y to each function'''
-    },
-    6: {
-        'name': 'Swap + flip Y',
-        'code': '''// Swap X/Y + flip Y
-static inline int to_wacom_x(int x) { return WACOM_MAX_Y - y; }
-static inline int to_wacom_y(int y) { return x; }
-// WARNING: This requires passing both x and y to each function'''
-    },
-    7: {
-        'name': 'Swap + flip X',
-        'code': '''// Swap X/Y + flip X
-static inline int to_wacom_x(int x) { return y; }
-static inline int to_wacom_y(int y) { return WACOM_MAX_X - x; }
-// WARNING: This requires passing both x and y to each function'''
-    },
-    8: {
-        'name': 'Swap + flip both',
-        'code': '''// Swap X/Y + flip both
-static inline int to_wacom_x(int x) { return WACOM_MAX_Y - y; }
-static inline int to_wacom_y(int y) { return WACOM_MAX_X - x; }
-// WARNING: This requires passing both x and y to each function'''
-    },
+    1: {'name': 'Identity (no transform)', 'x': 'x', 'y': 'y'},
+    2: {'name': 'Flip horizontal', 'x': 'WACOM_MAX_X - x', 'y': 'y'},
+    3: {'name': 'Flip vertical', 'x': 'x', 'y': 'WACOM_MAX_Y - y'},
+    4: {'name': 'Flip both (180° rotation)', 'x': 'WACOM_MAX_X - x', 'y': 'WACOM_MAX_Y - y'},
+    5: {'name': 'Swap X/Y (90° rotation)', 'x': 'y', 'y': 'x'},
+    6: {'name': 'Swap + flip Y', 'x': 'WACOM_MAX_Y - y', 'y': 'x'},
+    7: {'name': 'Swap + flip X', 'x': 'y', 'y': 'WACOM_MAX_X - x'},
+    8: {'name': 'Swap + flip both', 'x': 'WACOM_MAX_Y - y', 'y': 'WACOM_MAX_X - x'},
 }
 
+# Both functions take (x, y), so swapped transforms need no call-site changes
+TRANSFORM_TEMPLATE = Template('''// Transformation #$num: $name
+// PEN (x,y) -> Wacom: x_wacom = $x, y_wacom = $y
+static inline int to_wacom_x(int x, int y) { return $x; }
+static inline int to_wacom_y(int x, int y) { return $y; }''')
+
+
+def transform_code(transform_num):
+    """C source for the to_wacom_x/to_wacom_y pair of a transformation."""
+    return TRANSFORM_TEMPLATE.substitute(num=transform_num, **TRANSFORMATIONS[transform_num])
+
 
 def update_inject_c(transform_num):
     """Update inject.c with the correct transformation."""
@@ -86,39 +60,27 @@ def update_inject_c(transform_num):
     with open(inject_path, 'r') as f:
         content = f.read()
 
-    # Find and replace transformation functions
-    pattern = r'// PEN commands already use Wacom coordinates - pass through directly\s*\nstatic inline int to_wacom_x\(int x\) \{ return x; \}\s*\nstatic inline int to_wacom_y\(int y\) \{ return y; \}'
-
-    if transform_num in [1, 2, 3, 4]:
-        # Simple transformations
-        new_code = TRANSFORMATIONS[transform_num]['code']
-        updated_content = re.sub(pattern, new_code, content)
-
-        if updated_content == content:
-            # Try alternative pattern (any existing transform)
-            pattern = r'//[^\n]*\nstatic inline int to_wacom_x\([^)]+\)[^}]+}\s*\nstatic inline int to_wacom_y\([^)]+\)[^}]+}'
-            updated_content = re.sub(pattern, new_code, content)
+    # Locate the transformation functions between the marker comments
+    begin = content.find(TO_WACOM_BEGIN)
+    end = content.find(TO_WACOM_END, begin)
+    if begin < 0 or end < 0:
+        print(f"[ERROR] Transform markers not found in: {inject_path}")
+        print(f"        Expected {TO_WACOM_BEGIN} ... {TO_WACOM_END}")
+        return False
+    begin = content.index('\n', begin) + 1  # Keep the whole BEGIN marker line
 
-        with open(inject_path, 'w') as f:
-            f.write(updated_content)
+    new_code = transform_code(transform_num)
+    updated_content = content[:begin] + new_code + '\n' + content[end:]
 
-        print(f"[OK] Updated inject.c with transformation {transform_num}")
-        print(f"     {TRANSFORMATIONS[transform_num]['name']}")
-        return True
+    # Write a sibling file and swap it in, so inject.c is never half-written
+    tmp_path = inject_path.with_name(inject_path.name + '.tmp')
+    with open(tmp_path, 'w') as f:
+        f.write(updated_content)
+    os.replace(tmp_path, inject_path)
 
-    else:
-        # Swap transformations (5-8) - more complex, requires both x and y
-        print(f"[WARN] Transformation {transform_num} requires swap (both x and y)")
-        print(f"       {TRANSFORMATIONS[transform_num]['name']}")
-        print()
-        print("This transformation requires modifying the function signatures")
-        print("to pass both x and y coordinates. Manual update needed.")
-        print()
-        print("Required changes:")
-        print(TRANSFORMATIONS[transform_num]['code'])
-        print()
-        print("Also update all calls to to_wacom_x and to_wacom_y to pass both values.")
-        return False
+    print(f"[OK] Updated inject.c with transformation {transform_num}")
+    print(f"     {TRANSFORMATIONS[transform_num]['name']}")
+    return True
 
 
 def main():
@@ -166,7 +128,7 @@ def main():
         print("  4. Test again with visual_test.txt")
     else:
         print()
-        print("Manual update required. See above for details.")
+        print("inject.c was not changed. See above for details.")
 
 
 if __name__ == '__main__':
@@ -6,6 +6,17 @@ Analyzes real pen input to understand stroke patterns
 
 import sys
 import re
+import math
+import mmap
+from functools import lru_cache
+from itertools import chain, islice
+from operator import sub
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:  # Optional: the pure-Python stroke builder is used instead
+    njit = None
 
 # Wacom coordinate system (from inject.c)
 WACOM_MAX_X = 15725
@@ -13,67 +24,183 @@ WACOM_MAX_Y = 20967
 RM2_WIDTH = 1404
 RM2_HEIGHT = 1872
 
+# Every evtest event the parser cares about, in one pattern:
+# "type 3 (EV_ABS), code 0 (ABS_X), value 123", "... (BTN_TOUCH), value 1" or SYN_REPORT.
+# ABS and BTN_TOUCH share their prefix and value group, so the scan takes a single
+# branch per "type" and yields (axis, value) with axis empty for BTN_TOUCH
+EVENT_RE = re.compile(
+    rb'type \d+ \((?:EV_ABS\), code \d+ \(ABS_([XY])|EV_KEY\), code \d+ \(BTN_TOUCH)\), value (\d+)'
+    rb'|SYN_REPORT')
+
+# Event kinds produced by read_events
+EV_ABS_X = 0
+EV_ABS_Y = 1
+EV_TOUCH = 2
+EV_SYN = 3
+
+# Captures with at least this many events build strokes in the Numba kernel
+# when numba is installed; below it the array conversion costs more than it saves
+JIT_MIN_EVENTS = 4096
+
+# The kernel takes each event as one uint64, so the hot loop reads a single
+# stream: kind in the top byte, value in the low 56 bits
+EVENT_KIND_SHIFT = 56
+EVENT_VALUE_MASK = (1 << EVENT_KIND_SHIFT) - 1
+
 def wacom_to_display(wx, wy):
     """Convert Wacom coordinates to display coordinates"""
     # From inject.c: Display X → Wacom Y, Display Y → Wacom X (90° rotation)
     # Reverse: Wacom X → Display Y, Wacom Y → Display X
-    x = int(wy * RM2_WIDTH / WACOM_MAX_Y)
-    y = int(wx * RM2_HEIGHT / WACOM_MAX_X)
+    # Integer floor division; matches int(a * b / c) for non-negative coordinates
+    x = wy * RM2_WIDTH // WACOM_MAX_Y
+    y = wx * RM2_HEIGHT // WACOM_MAX_X
     return x, y
 
-def parse_evtest(input_file):
-    """Parse evtest output into strokes"""
+def read_events(input_file):
+    """Scan evtest output into parallel lists of event kinds and values"""
+
+    kinds = []
+    values = []
+
+    # Scan the mapped file as bytes: no line list, no decode
+    with open(input_file, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file, nothing to map
+            return kinds, values
+
+        with data:
+            events = EVENT_RE.findall(data)
+
+    for axis, value in events:
+        if axis:
+            kinds.append(EV_ABS_X if axis == b'X' else EV_ABS_Y)
+            values.append(int(value))
+        elif value:
+            kinds.append(EV_TOUCH)
+            values.append(int(value))
+        else:
+            kinds.append(EV_SYN)
+            values.append(0)
+
+    return kinds, values
 
-    with open(input_file, 'r') as f:
-        lines = f.readlines()
+def build_strokes(kinds, values):
+    """Replay events into strokes of display coordinates"""
 
     strokes = []
     current_stroke = []
-    current_x = None
-    current_y = None
+    # Display coordinates of the pen, updated as each ABS event arrives (see
+    # wacom_to_display: Wacom Y gives display X, Wacom X gives display Y)
+    display_x = None
+    display_y = None
+    last_x = last_y = None  # Last point of current_stroke, None when it's empty
     pen_down = False
 
-    for line in lines:
-        # Look for event lines: "Event: time 1234.567890, type X (EV_ABS), code Y (ABS_X), value Z"
-        match = re.search(r'type \d+ \(EV_ABS\), code \d+ \(ABS_([XY])\), value (\d+)', line)
-        if match:
-            axis = match.group(1)
-            value = int(match.group(2))
+    for kind, value in zip(kinds, values):
+        # SYN_REPORT marks the end of an event batch
+        if kind == EV_SYN:
+            if pen_down and display_x is not None and display_y is not None:
+                if display_x != last_x or display_y != last_y:
+                    last_x = display_x
+                    last_y = display_y
+                    current_stroke.append((last_x, last_y))
+
+        elif kind == EV_ABS_X:
+            display_y = value * RM2_HEIGHT // WACOM_MAX_X
+        elif kind == EV_ABS_Y:
+            display_x = value * RM2_WIDTH // WACOM_MAX_Y
+
+        elif value == 1:  # Pen down
+            pen_down = True
+            if display_x is not None and display_y is not None:
+                last_x = display_x
+                last_y = display_y
+                current_stroke = [(last_x, last_y)]
+
+        elif value == 0:  # Pen up
+            pen_down = False
+            if current_stroke:
+                strokes.append(current_stroke)
+                current_stroke = []
+                last_x = last_y = None
 
-            if axis == 'X':
-                current_x = value
-            elif axis == 'Y':
-                current_y = value
+    # Add last stroke if exists
+    if current_stroke:
+        strokes.append(current_stroke)
 
-        # Look for BTN_TOUCH events
-        match_touch = re.search(r'type \d+ \(EV_KEY\), code \d+ \(BTN_TOUCH\), value (\d+)', line)
-        if match_touch:
-            touch_value = int(match_touch.group(1))
+    return strokes
 
-            if touch_value == 1:  # Pen down
+if njit is not None:
+    @njit(cache=True)
+    def _build_strokes_kernel(events):
+        # Same state machine as build_strokes; -1 stands in for "no coordinate yet".
+        # Each event is packed as kind << EVENT_KIND_SHIFT | value (see pack_events).
+        # Points go into flat xs/ys arrays, ends[k] is one past stroke k's last point
+        n = events.shape[0]
+        xs = np.empty(n, np.int64)
+        ys = np.empty(n, np.int64)
+        ends = np.empty(n, np.int64)
+        n_points = 0
+        n_strokes = 0
+        start = 0
+        display_x = -1
+        display_y = -1
+        pen_down = False
+
+        for i in range(n):
+            event = np.int64(events[i])  # Kinds fit in 7 bits, so this stays non-negative
+            kind = event >> EVENT_KIND_SHIFT
+            value = event & EVENT_VALUE_MASK
+            if kind == EV_SYN:
+                if pen_down and display_x >= 0 and display_y >= 0:
+                    if (n_points == start or display_x != xs[n_points - 1]
+                            or display_y != ys[n_points - 1]):
+                        xs[n_points] = display_x
+                        ys[n_points] = display_y
+                        n_points += 1
+            elif kind == EV_ABS_X:
+                display_y = value * RM2_HEIGHT // WACOM_MAX_X
+            elif kind == EV_ABS_Y:
+                display_x = value * RM2_WIDTH // WACOM_MAX_Y
+            elif value == 1:
                 pen_down = True
-                if current_x is not None and current_y is not None:
-                    x, y = wacom_to_display(current_x, current_y)
-                    current_stroke = [(x, y)]
-
-            elif touch_value == 0:  # Pen up
+                if display_x >= 0 and display_y >= 0:
+                    n_points = start
+                    xs[n_points] = display_x
+                    ys[n_points] = display_y
+                    n_points += 1
+            elif value == 0:
                 pen_down = False
-                if current_stroke:
-                    strokes.append(current_stroke)
-                    current_stroke = []
+                if n_points > start:
+                    ends[n_strokes] = n_points
+                    n_strokes += 1
+                    start = n_points
 
-        # Look for SYN_REPORT (marks end of event batch)
-        if 'SYN_REPORT' in line:
-            if pen_down and current_x is not None and current_y is not None:
-                x, y = wacom_to_display(current_x, current_y)
-                if not current_stroke or (x, y) != current_stroke[-1]:
-                    current_stroke.append((x, y))
+        if n_points > start:
+            ends[n_strokes] = n_points
+            n_strokes += 1
 
-    # Add last stroke if exists
-    if current_stroke:
-        strokes.append(current_stroke)
+        return xs[:n_points], ys[:n_points], ends[:n_strokes]
 
-    return strokes
+def pack_events(kinds, values):
+    """Pack events into one uint64 array, kind in the top byte and value below it"""
+    events = np.array(values, dtype=np.uint64) & EVENT_VALUE_MASK
+    events |= np.array(kinds, dtype=np.uint64) << np.uint64(EVENT_KIND_SHIFT)
+    return events
+
+def parse_evtest(input_file):
+    """Parse evtest output into strokes"""
+
+    kinds, values = read_events(input_file)
+
+    if njit is None or len(kinds) < JIT_MIN_EVENTS:
+        return build_strokes(kinds, values)
+
+    xs, ys, ends = _build_strokes_kernel(pack_events(kinds, values))
+    points = list(zip(xs.tolist(), ys.tolist()))
+    ends = ends.tolist()
+    return [points[start:end] for start, end in zip([0] + ends, ends)]
 
 def analyze_strokes(strokes):
     """Analyze stroke patterns"""
@@ -88,15 +215,9 @@ def analyze_strokes(strokes):
         print(f"  Points: {len(stroke)}")
 
         if len(stroke) >= 2:
-            # Calculate stroke length
-            total_length = 0
-            for j in range(1, len(stroke)):
-                x1, y1 = stroke[j - 1]
-                x2, y2 = stroke[j]
-                dx = x2 - x1
-                dy = y2 - y1
-                length = (dx*dx + dy*dy) ** 0.5
-                total_length += length
+            # Calculate stroke length: sum of distances between consecutive points
+            total_length = sum(math.hypot(x2 - x1, y2 - y1)
+                               for (x1, y1), (x2, y2) in zip(stroke, islice(stroke, 1, None)))
 
             print(f"  Length: {total_length:.1f} pixels")
 
@@ -105,42 +226,45 @@ def analyze_strokes(strokes):
             print(f"  Avg point spacing: {avg_spacing:.2f} pixels")
 
             # Bounds
-            xs = [p[0] for p in stroke]
-            ys = [p[1] for p in stroke]
+            xs, ys = zip(*stroke)
             print(f"  Bounds: ({min(xs)}, {min(ys)}) to ({max(xs)}, {max(ys)})")
 
         print()
 
-def strokes_to_pen(strokes, output_file=None):
-    """Convert strokes to PEN commands"""
+@lru_cache(maxsize=None)
+def stroke_template(point_count, delta=False):
+    """% template for one stroke: PEN_DOWN, the rest as PEN_MOVE (or PEN_DELTA), PEN_UP"""
+    step = "PEN_DELTA %d %d\n" if delta else "PEN_MOVE %d %d\n"
+    return "PEN_DOWN %d %d\n" + step * (point_count - 1) + "PEN_UP\n"
+
+def strokes_to_pen(strokes, output_file=None, delta=False):
+    """Convert strokes to PEN command text (PEN_DELTA steps after PEN_DOWN with delta)"""
 
-    commands = []
+    chunks = []
+    command_count = 0
 
     for stroke in strokes:
         if not stroke:
             continue
 
-        # First point: PEN_DOWN
-        x, y = stroke[0]
-        commands.append(f"PEN_DOWN {x} {y}")
+        # Each stroke is formatted by one % call over its interleaved coordinates
+        flat = tuple(chain.from_iterable(stroke))
+        if delta:
+            # Differences of interleaved coordinates two apart are the dx, dy steps
+            flat = flat[:2] + tuple(map(sub, flat[2:], flat))
+        chunks.append(stroke_template(len(stroke), delta) % flat)
+        command_count += len(stroke) + 1
 
-        # Middle points: PEN_MOVE
-        for x, y in stroke[1:]:
-            commands.append(f"PEN_MOVE {x} {y}")
-
-        # End stroke
-        commands.append("PEN_UP")
-
-    output = '\n'.join(commands) + '\n'
+    output = ''.join(chunks)
 
     if output_file:
         with open(output_file, 'w') as f:
             f.write(output)
-        print(f"✓ Saved {len(commands)} commands to: {output_file}")
+        print(f"✓ Saved {command_count} commands to: {output_file}")
     else:
         print(output)
 
-    return commands
+    return output
 
 def main():
     if len(sys.argv) < 2:
@@ -152,6 +276,7 @@ def main():
         print("Options:")
         print("  -o <file>       Output PEN commands to file")
         print("  --analyze       Show stroke analysis")
+        print("  --delta         Write PEN_DELTA dx dy instead of PEN_MOVE x y")
         print()
         print("Workflow:")
         print("  1. On RM2: ./capture_events.sh")
@@ -163,6 +288,7 @@ def main():
     input_file = sys.argv[1]
     output_file = None
     show_analysis = False
+    delta = False
 
     i = 2
     while i < len(sys.argv):
@@ -174,6 +300,9 @@ def main():
         elif arg == '--analyze':
             show_analysis = True
             i += 1
+        elif arg == '--delta':
+            delta = True
+            i += 1
         else:
             print(f"Unknown argument: {arg}")
             return 1
@@ -191,7 +320,7 @@ def main():
         print()
 
     # Convert to PEN commands
-    strokes_to_pen(strokes, output_file)
+    strokes_to_pen(strokes, output_file, delta)
 
     return 0
 
@@ -7,273 +7,494 @@ Generates pen commands that mimic natural handwriting
 - No duplicate/coincident points
 """
 
+import os
 import sys
+import re
 import xml.etree.ElementTree as ET
-import math
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice, repeat
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:  # Optional: curves are sampled in pure Python instead
+    njit = None
+
+# Each extra worker process needs at least this many paths to pay for its startup
+PATHS_PER_WORKER = 1000
+
+# <path> as ElementTree spells it, with and without the SVG namespace
+PATH_TAGS = frozenset(('{http://www.w3.org/2000/svg}path', 'path'))
+
+# One command letter followed by its (unparsed) argument list
+PATH_COMMAND_RE = re.compile(r'([MmLlHhVvCcSsQqTtAaZz])([^MmLlHhVvCcSsQqTtAaZz]*)')
+NUMBER = r'[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?'
+NUMBER_RE = re.compile(NUMBER)
+
+# Whole path of absolute M/L commands, each with one or more coordinate
+# pairs. Separators are required wherever two numbers could run together,
+# so every number the pattern accepts is one NUMBER_RE token.
+_PAIR = NUMBER + r'[\s,]+' + NUMBER
+ABSOLUTE_POLYLINE_RE = re.compile(r'(?:\s*[ML]\s*' + _PAIR + r'(?:[\s,]+' + _PAIR + r')*)+\s*')
+# Any character that rules the above out; far cheaper to scan for first
+NOT_ABSOLUTE_POLYLINE_RE = re.compile(r'[^ML\d\s,.eE+-]')
+# Any character that float() could accept but NUMBER_RE would not ("inf", "1_0")
+NOT_NUMBER_LIST_RE = re.compile(r'[^\d\s,.eE+-]')
+
+# Curves with at least this many steps are sampled by the Numba kernels when
+# numba is installed; below it converting the samples back to lists costs more
+# than the kernel saves
+JIT_MIN_CURVE_STEPS = 32
+
+@lru_cache(maxsize=None)
+def cubic_weights(steps):
+    """Bernstein weights of a cubic Bezier sampled at t = 1/steps .. 1"""
+    weights = []
+    for t_i in range(1, steps + 1):
+        t = t_i / steps
+        weights.append(((1-t)**3, 3*(1-t)**2*t, 3*(1-t)*t**2, t**3))
+    return tuple(weights)
+
+@lru_cache(maxsize=None)
+def quadratic_weights(steps):
+    """Bernstein weights of a quadratic Bezier sampled at t = 1/steps .. 1"""
+    weights = []
+    for t_i in range(1, steps + 1):
+        t = t_i / steps
+        weights.append(((1-t)**2, 2*(1-t)*t, t**2))
+    return tuple(weights)
+
+if njit is not None:
+    @lru_cache(maxsize=None)
+    def jit_buffers(steps):
+        """
+        Weight tables and the sample scratch array for one step count
+
+        Shared by every path sampled at that count, so a path allocates no
+        arrays. The scratch is overwritten by each curve and copied out
+        right away, which is safe because paths are sampled one at a time.
+        """
+        return (np.array(cubic_weights(steps)), np.array(quadratic_weights(steps)),
+                np.empty((steps, 2)))
+
+    @njit(cache=True)
+    def _sample_cubic(x0, y0, x1, y1, x2, y2, x3, y3, weights, out):
+        # Same expression order as the pure-Python sampler, so results match
+        for i in range(weights.shape[0]):
+            a = weights[i, 0]
+            b = weights[i, 1]
+            c = weights[i, 2]
+            w = weights[i, 3]
+            out[i, 0] = a * x0 + b * x1 + c * x2 + w * x3
+            out[i, 1] = a * y0 + b * y1 + c * y2 + w * y3
+
+    @njit(cache=True)
+    def _sample_quadratic(x0, y0, x1, y1, x2, y2, weights, out):
+        for i in range(weights.shape[0]):
+            a = weights[i, 0]
+            b = weights[i, 1]
+            w = weights[i, 2]
+            out[i, 0] = a * x0 + b * x1 + w * x2
+            out[i, 1] = a * y0 + b * y1 + w * y2
+
+def parse_numbers(args):
+    """Floats in a command's argument list"""
+    # Fast path: separated plain numbers split cleanly. Numbers that run
+    # together ("1.5-2.5", "1.5.5") make float() fail; tokenize those instead
+    if not NOT_NUMBER_LIST_RE.search(args):
+        try:
+            return list(map(float, args.replace(',', ' ').split()))
+        except ValueError:
+            pass
+    return list(map(float, NUMBER_RE.findall(args)))
+
+class PathSampler:
+    """
+    Running state of one path while it is sampled: the points so far, the
+    current point and the start of the subpath. There is one method per
+    path command; each takes the command's raw argument string and handles
+    implicit repeats ("L 1 2 3 4" is two line segments).
+    """
 
-def parse_number(s, i):
-    """Parse a number from string starting at index i"""
-    while i < len(s) and s[i] in ' \t\n,':
-        i += 1
+    def __init__(self, curve_steps):
+        self.xs = []
+        self.ys = []
+        self.current_x = 0.0
+        self.current_y = 0.0
+        self.start_x = 0.0
+        self.start_y = 0.0
+
+        # Basis tables are resolved once per path, not per curve: tuples for
+        # the pure-Python samplers, arrays for the Numba kernels
+        self.jit = njit is not None and curve_steps >= JIT_MIN_CURVE_STEPS
+        if self.jit:
+            self.cubic_table, self.quadratic_table, self.samples = jit_buffers(curve_steps)
+        else:
+            self.cubic_table = cubic_weights(curve_steps)
+            self.quadratic_table = quadratic_weights(curve_steps)
 
-    if i >= len(s):
-        return None, i
+    def move(self, args, relative):
+        # M - Move (extra coordinate pairs are implicit line-tos)
+        nums = parse_numbers(args)
+        if len(nums) < 2:
+            return
 
-    start = i
-    if s[i] in '+-':
-        i += 1
+        x, y = nums[0], nums[1]
+        if relative:
+            x = self.current_x + x
+            y = self.current_y + y
 
-    has_dot = False
-    while i < len(s) and (s[i].isdigit() or s[i] == '.'):
-        if s[i] == '.':
-            if has_dot:
-                break
-            has_dot = True
-        i += 1
+        self.current_x = self.start_x = x
+        self.current_y = self.start_y = y
+        self.xs.append(x)
+        self.ys.append(y)
 
-    if i > start:
-        return float(s[start:i]), i
-    return None, start
+        if len(nums) > 2:
+            self.line_to(nums[2:], relative)
 
-def parse_svg_path(d, curve_steps=10):
-    """
-    Parse SVG path with high-quality curve sampling
+    def line(self, args, relative):
+        # L - Line
+        self.line_to(parse_numbers(args), relative)
+
+    def line_to(self, nums, relative):
+        x = self.current_x
+        y = self.current_y
+        xs = self.xs
+        ys = self.ys
+
+        for k in range(0, len(nums) - 1, 2):
+            if relative:
+                x += nums[k]
+                y += nums[k + 1]
+            else:
+                x = nums[k]
+                y = nums[k + 1]
 
-    Args:
-        d: SVG path 'd' attribute
-        curve_steps: Number of steps for sampling curves (higher = smoother)
-    """
+            xs.append(x)
+            ys.append(y)
 
-    if not d:
-        return []
+        self.current_x = x
+        self.current_y = y
 
-    points = []
-    i = 0
-    current_x, current_y = 0.0, 0.0
-    last_cmd = None
-    start_x, start_y = 0.0, 0.0
+    def horizontal(self, args, relative):
+        # H - Horizontal line
+        x = self.current_x
+        for num in parse_numbers(args):
+            if relative:
+                x += num
+            else:
+                x = num
 
-    while i < len(d):
-        # Skip whitespace
-        while i < len(d) and d[i] in ' \t\n,':
-            i += 1
+            self.xs.append(x)
+            self.ys.append(self.current_y)
 
-        if i >= len(d):
-            break
+        self.current_x = x
 
-        # Check for command letter
-        if d[i].isalpha():
-            last_cmd = d[i]
-            i += 1
+    def vertical(self, args, relative):
+        # V - Vertical line
+        y = self.current_y
+        for num in parse_numbers(args):
+            if relative:
+                y += num
+            else:
+                y = num
 
-            # M command
-            if last_cmd in 'Mm':
-                x, i = parse_number(d, i)
-                y, i = parse_number(d, i)
+            self.xs.append(self.current_x)
+            self.ys.append(y)
 
-                if x is None or y is None:
-                    continue
+        self.current_y = y
 
-                if last_cmd == 'M':
-                    current_x, current_y = x, y
-                else:
-                    current_x += x
-                    current_y += y
+    def cubic(self, args, relative):
+        # C - Cubic Bezier (HIGH QUALITY SAMPLING)
+        nums = parse_numbers(args)
+        weights = self.cubic_table
+        extend_x = self.xs.extend
+        extend_y = self.ys.extend
+        x0 = self.current_x
+        y0 = self.current_y
+
+        for k in range(0, len(nums) - 5, 6):
+            x1, y1, x2, y2, x, y = nums[k:k + 6]
+            if relative:
+                x1 = x0 + x1
+                y1 = y0 + y1
+                x2 = x0 + x2
+                y2 = y0 + y2
+                x = x0 + x
+                y = y0 + y
+
+            # Sample cubic Bezier with high quality
+            if self.jit:
+                _sample_cubic(x0, y0, x1, y1, x2, y2, x, y, weights, self.samples)
+                extend_x(self.samples[:, 0].tolist())
+                extend_y(self.samples[:, 1].tolist())
+            else:
+                extend_x([a * x0 + b * x1 + c * x2 + w * x for a, b, c, w in weights])
+                extend_y([a * y0 + b * y1 + c * y2 + w * y for a, b, c, w in weights])
+
+            x0, y0 = x, y
+
+        self.current_x = x0
+        self.current_y = y0
+
+    def quadratic(self, args, relative):
+        # S - Smooth cubic Bezier / Q - Quadratic Bezier
+        nums = parse_numbers(args)
+        weights = self.quadratic_table
+        extend_x = self.xs.extend
+        extend_y = self.ys.extend
+        x0 = self.current_x
+        y0 = self.current_y
+
+        for k in range(0, len(nums) - 3, 4):
+            cx, cy, x, y = nums[k:k + 4]
+            if relative:
+                cx = x0 + cx
+                cy = y0 + cy
+                x = x0 + x
+                y = y0 + y
+
+            # Sample quadratic Bezier (S reuses its second control point)
+            if self.jit:
+                _sample_quadratic(x0, y0, cx, cy, x, y, weights, self.samples)
+                extend_x(self.samples[:, 0].tolist())
+                extend_y(self.samples[:, 1].tolist())
+            else:
+                extend_x([a * x0 + b * cx + w * x for a, b, w in weights])
+                extend_y([a * y0 + b * cy + w * y for a, b, w in weights])
 
-                start_x, start_y = current_x, current_y
-                points.append((current_x, current_y))
+            x0, y0 = x, y
 
-                last_cmd = 'L' if last_cmd == 'M' else 'l'
-                continue
+        self.current_x = x0
+        self.current_y = y0
 
-        # L - Line
-        if last_cmd in 'Ll':
-            x, i = parse_number(d, i)
-            y, i = parse_number(d, i)
+    def close(self, args, relative):
+        # Z - Close path
+        if (self.current_x, self.current_y) != (self.start_x, self.start_y):
+            self.xs.append(self.start_x)
+            self.ys.append(self.start_y)
+        self.current_x = self.start_x
+        self.current_y = self.start_y
+
+    def skip(self, args, relative):
+        # T and A are not sampled; their arguments are skipped
+        pass
+
+# Command letter -> (PathSampler method, relative)
+PATH_COMMANDS = {}
+for _letter, _handler in (('M', PathSampler.move), ('L', PathSampler.line),
+                          ('H', PathSampler.horizontal), ('V', PathSampler.vertical),
+                          ('C', PathSampler.cubic), ('S', PathSampler.quadratic),
+                          ('Q', PathSampler.quadratic), ('T', PathSampler.skip),
+                          ('A', PathSampler.skip), ('Z', PathSampler.close)):
+    PATH_COMMANDS[_letter] = (_handler, False)
+    PATH_COMMANDS[_letter.lower()] = (_handler, True)
 
-            if x is None or y is None:
-                break
+def parse_svg_path(d, curve_steps=10):
+    """
+    Parse SVG path with high-quality curve sampling
 
-            if last_cmd == 'L':
-                current_x, current_y = x, y
-            else:
-                current_x += x
-                current_y += y
+    Args:
+        d: SVG path 'd' attribute
+        curve_steps: Number of steps for sampling curves (higher = smoother)
 
-            points.append((current_x, current_y))
+    Returns:
+        (xs, ys) parallel lists of sampled coordinates
+    """
 
-        # H - Horizontal line
-        elif last_cmd in 'Hh':
-            x, i = parse_number(d, i)
-            if x is None:
-                break
+    if not d:
+        return [], []
 
-            if last_cmd == 'H':
-                current_x = x
-            else:
-                current_x += x
+    # Straight polyline in absolute coordinates (e.g. reMarkable exports):
+    # the points are just the numbers, pairwise
+    if not NOT_ABSOLUTE_POLYLINE_RE.search(d) and ABSOLUTE_POLYLINE_RE.fullmatch(d):
+        nums = parse_numbers(d)
+        return nums[0::2], nums[1::2]
 
-            points.append((current_x, current_y))
+    sampler = PathSampler(curve_steps)
 
-        # V - Vertical line
-        elif last_cmd in 'Vv':
-            y, i = parse_number(d, i)
-            if y is None:
-                break
+    for cmd, args in PATH_COMMAND_RE.findall(d):
+        handler, relative = PATH_COMMANDS[cmd]
+        handler(sampler, args, relative)
 
-            if last_cmd == 'V':
-                current_y = y
-            else:
-                current_y += y
+    return sampler.xs, sampler.ys
 
-            points.append((current_x, current_y))
+def remove_coincident_points(xs, ys, min_distance=0.5):
+    """
+    Remove points that are too close together
 
-        # C - Cubic Bezier (HIGH QUALITY SAMPLING)
-        elif last_cmd in 'Cc':
-            coords = []
-            for _ in range(6):
-                num, i = parse_number(d, i)
-                if num is None:
-                    break
-                coords.append(num)
-
-            if len(coords) == 6:
-                if last_cmd == 'C':
-                    x1, y1, x2, y2, x, y = coords
-                else:
-                    x1 = current_x + coords[0]
-                    y1 = current_y + coords[1]
-                    x2 = current_x + coords[2]
-                    y2 = current_y + coords[3]
-                    x = current_x + coords[4]
-                    y = current_y + coords[5]
-
-                # Sample cubic Bezier with high quality
-                for t_i in range(1, curve_steps + 1):
-                    t = t_i / curve_steps
-                    # Cubic Bezier formula
-                    bx = (1-t)**3 * current_x + 3*(1-t)**2*t * x1 + 3*(1-t)*t**2 * x2 + t**3 * x
-                    by = (1-t)**3 * current_y + 3*(1-t)**2*t * y1 + 3*(1-t)*t**2 * y2 + t**3 * y
-                    points.append((bx, by))
-
-                current_x, current_y = x, y
-
-        # S - Smooth cubic Bezier
-        elif last_cmd in 'Ss':
-            coords = []
-            for _ in range(4):
-                num, i = parse_number(d, i)
-                if num is None:
-                    break
-                coords.append(num)
-
-            if len(coords) == 4:
-                if last_cmd == 'S':
-                    x2, y2, x, y = coords
-                else:
-                    x2 = current_x + coords[0]
-                    y2 = current_y + coords[1]
-                    x = current_x + coords[2]
-                    y = current_y + coords[3]
-
-                # Sample smooth curve
-                for t_i in range(1, curve_steps + 1):
-                    t = t_i / curve_steps
-                    bx = (1-t)**2 * current_x + 2*(1-t)*t * x2 + t**2 * x
-                    by = (1-t)**2 * current_y + 2*(1-t)*t * y2 + t**2 * y
-                    points.append((bx, by))
-
-                current_x, current_y = x, y
-
-        # Q - Quadratic Bezier
-        elif last_cmd in 'Qq':
-            coords = []
-            for _ in range(4):
-                num, i = parse_number(d, i)
-                if num is None:
-                    break
-                coords.append(num)
-
-            if len(coords) == 4:
-                if last_cmd == 'Q':
-                    cx, cy, x, y = coords
-                else:
-                    cx = current_x + coords[0]
-                    cy = current_y + coords[1]
-                    x = current_x + coords[2]
-                    y = current_y + coords[3]
-
-                # Sample quadratic Bezier
-                for t_i in range(1, curve_steps + 1):
-                    t = t_i / curve_steps
-                    bx = (1-t)**2 * current_x + 2*(1-t)*t * cx + t**2 * x
-                    by = (1-t)**2 * current_y + 2*(1-t)*t * cy + t**2 * y
-                    points.append((bx, by))
-
-                current_x, current_y = x, y
+    Args:
+        xs, ys: Parallel lists of x and y coordinates
+        min_distance: Minimum distance between consecutive points
+    """
+    if not xs:
+        return [], []
 
-        # Z - Close path
-        elif last_cmd in 'Zz':
-            if (current_x, current_y) != (start_x, start_y):
-                points.append((start_x, start_y))
-            current_x, current_y = start_x, start_y
-            i += 1
+    # Compare squared distances (no sqrt); a minimum <= 0 keeps every point
+    min_distance_sq = min_distance * min_distance if min_distance > 0 else 0.0
 
-        else:
-            i += 1
+    last_x = xs[0]
+    last_y = ys[0]
+    result_x = [last_x]
+    result_y = [last_y]
+
+    for x, y in islice(zip(xs, ys), 1, None):
+        dx = x - last_x
+        dy = y - last_y
+        if dx*dx + dy*dy >= min_distance_sq:
+            result_x.append(x)
+            result_y.append(y)
+            last_x = x
+            last_y = y
 
-    return points
+    return result_x, result_y
 
-def remove_coincident_points(points, min_distance=0.5):
+def scale_points(xs, ys, scale, min_distance=0.5):
     """
-    Remove points that are too close together
+    Remove points that are too close together, scale the rest to integers
+    and drop consecutive integer duplicates, all in one pass
+
+    Gives the same points as remove_coincident_points followed by scaling
+    and integer deduplication.
 
     Args:
-        points: List of (x, y) tuples
+        xs, ys: Parallel lists of x and y coordinates
+        scale: Scale factor
         min_distance: Minimum distance between consecutive points
+
+    Returns:
+        Interleaved integer coordinates [x0, y0, x1, y1, ...]
     """
-    if not points:
+    if not xs:
         return []
 
-    result = [points[0]]
+    # Compare squared distances (no sqrt); a minimum <= 0 keeps every point
+    min_distance_sq = min_distance * min_distance if min_distance > 0 else 0.0
+
+    last_x = xs[0]
+    last_y = ys[0]
+    point_x = int(last_x * scale)
+    point_y = int(last_y * scale)
+    result = [point_x, point_y]
 
-    for x, y in points[1:]:
-        last_x, last_y = result[-1]
+    for x, y in islice(zip(xs, ys), 1, None):
         dx = x - last_x
         dy = y - last_y
-        distance = math.sqrt(dx*dx + dy*dy)
-
-        if distance >= min_distance:
-            result.append((x, y))
+        if dx*dx + dy*dy >= min_distance_sq:
+            last_x = x
+            last_y = y
+            scaled_x = int(x * scale)
+            scaled_y = int(y * scale)
+            if scaled_x != point_x or scaled_y != point_y:
+                result += (scaled_x, scaled_y)
+                point_x = scaled_x
+                point_y = scaled_y
 
     return result
 
-def smooth_stroke(points, window=3):
+def box_average(values, half):
+    """
+    Moving average over values[i-half:i+half+1] (clipped at the ends),
+    keeping the first and last value as they are
+
+    Interior windows are read from 2*half+1 shifted slices zipped together
+    by map, which avoids slicing the list per point; each window is still
+    summed left to right, so results match sum(values[start:end]) exactly.
+    """
+    n = len(values)
+    if not half:
+        return [values[0], *values[1:-1], values[-1]]
+
+    def clipped(i):
+        start = max(0, i - half)
+        end = min(n, i + half + 1)
+        return sum(values[start:end]) / (end - start)
+
+    # Interior points in range(lo, hi) have a full 2*half+1 window
+    width = 2 * half + 1
+    lo = max(1, half)
+    hi = n - half
+    head = min(lo, n - 1)
+
+    averaged = [values[0]]  # Keep first point
+    averaged += [clipped(i) for i in range(1, head)]
+    if hi > lo:
+        shifted = [islice(values, lo - half + k, hi - half + k) for k in range(width)]
+        averaged += map(lambda *window: sum(window) / width, *shifted)
+    averaged += [clipped(i) for i in range(max(hi, head), n - 1)]
+    averaged.append(values[-1])  # Keep last point
+
+    return averaged
+
+def smooth_stroke(xs, ys, window=3):
     """
     Apply smoothing filter to reduce jitter
 
     Args:
-        points: List of (x, y) tuples
+        xs, ys: Parallel lists of x and y coordinates
         window: Smoothing window size
     """
-    if len(points) < window:
-        return points
+    if len(xs) < window:
+        return xs, ys
 
-    smoothed = [points[0]]  # Keep first point
+    # Average with neighbors
+    return box_average(xs, window // 2), box_average(ys, window // 2)
 
-    for i in range(1, len(points) - 1):
-        # Average with neighbors
-        start = max(0, i - window // 2)
-        end = min(len(points), i + window // 2 + 1)
+@lru_cache(maxsize=256)
+def stroke_template(point_count):
+    """% template for one stroke: PEN_DOWN, the rest as PEN_MOVE, PEN_UP"""
+    return b"PEN_DOWN %d %d\n" + b"PEN_MOVE %d %d\n" * (point_count - 1) + b"PEN_UP\n"
 
-        avg_x = sum(p[0] for p in points[start:end]) / (end - start)
-        avg_y = sum(p[1] for p in points[start:end]) / (end - start)
+def path_data(svg_file):
+    """
+    Collect the 'd' attribute of every <path> element in an SVG
 
-        smoothed.append((avg_x, avg_y))
+    The file is streamed with iterparse and each element is cleared once
+    it has been read, so the full DOM is never held in memory.
+    """
+    paths = []
 
-    smoothed.append(points[-1])  # Keep last point
+    for _, elem in ET.iterparse(svg_file):
+        if elem.tag in PATH_TAGS:
+            d = elem.get('d')
+            if d:
+                paths.append(d)
+        elem.clear()
 
-    return smoothed
+    return paths
+
+def path_to_pen(d, scale, curve_quality, smoothness, min_distance):
+    """
+    Convert one path's 'd' attribute to a single PEN stroke
+
+    Returns:
+        (commands, point_count): the stroke's PEN commands as bytes and
+        its number of points (0 and b"" when nothing is left to draw)
+    """
+    # Parse with high quality
+    xs, ys = parse_svg_path(d, curve_steps=curve_quality)
+
+    if not xs:
+        return b"", 0
+
+    # Remove coincident points
+    xs, ys = remove_coincident_points(xs, ys, min_distance=min_distance)
+
+    # Apply smoothing
+    if smoothness > 0:
+        xs, ys = smooth_stroke(xs, ys, window=smoothness)
+
+    # Remove coincident again after smoothing, scale and remove
+    # integer duplicates
+    coords = scale_points(xs, ys, scale, min_distance=min_distance)
+
+    if not coords:
+        return b"", 0
+
+    # Convert to PEN commands (SINGLE STROKE), one % call per path
+    point_count = len(coords) // 2
+    return stroke_template(point_count) % tuple(coords), point_count
 
 def svg_to_pen(svg_file, scale=1.0, curve_quality=10, smoothness=3, min_distance=0.5, output_file=None):
     """
@@ -289,80 +510,49 @@ def svg_to_pen(svg_file, scale=1.0, curve_quality=10, smoothness=3, min_distance
     """
 
     try:
-        tree = ET.parse(svg_file)
-        root = tree.getroot()
+        paths = path_data(svg_file)
     except Exception as e:
         print(f"Error parsing SVG: {e}", file=sys.stderr)
         return 1
 
-    commands = []
+    buf = bytearray()
     path_count = 0
     total_points = 0
 
-    # Find all path elements
-    for path in root.iter():
-        if path.tag.endswith('path'):
-            d = path.get('d')
-            if not d:
-                continue
-
-            # Parse with high quality
-            points = parse_svg_path(d, curve_steps=curve_quality)
-
-            if not points:
-                continue
-
-            # Remove coincident points
-            points = remove_coincident_points(points, min_distance=min_distance)
-
-            # Apply smoothing
-            if smoothness > 0:
-                points = smooth_stroke(points, window=smoothness)
-
-            # Remove coincident again after smoothing
-            points = remove_coincident_points(points, min_distance=min_distance)
-
-            if not points:
-                continue
-
-            # Scale points
-            scaled_points = [(int(x * scale), int(y * scale)) for x, y in points]
-
-            # Remove integer duplicates
-            unique_points = []
-            for p in scaled_points:
-                if not unique_points or p != unique_points[-1]:
-                    unique_points.append(p)
-
-            # Convert to PEN commands (SINGLE STROKE)
-            if unique_points:
-                x, y = unique_points[0]
-                commands.append(f"PEN_DOWN {x} {y}")
-
-                for x, y in unique_points[1:]:
-                    commands.append(f"PEN_MOVE {x} {y}")
+    # Paths are independent, so large drawings are split across processes
+    settings = (scale, curve_quality, smoothness, min_distance)
+    workers = min(len(paths) // PATHS_PER_WORKER, os.cpu_count() or 1)
+    if workers <= 1:
+        results = [path_to_pen(d, *settings) for d in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(path_to_pen, paths, *map(repeat, settings),
+                                        chunksize=len(paths) // (workers * 4)))
 
-                commands.append("PEN_UP")
-                path_count += 1
-                total_points += len(unique_points)
+    for commands, point_count in results:
+        if point_count:
+            buf += commands
+            path_count += 1
+            total_points += point_count
 
-    if not commands:
+    if not buf:
         print("Warning: No paths found in SVG", file=sys.stderr)
         return 1
 
-    # Output
-    output = '\n'.join(commands) + '\n'
+    # Output (one PEN_UP per path on top of the points)
+    command_count = total_points + path_count
 
     if output_file:
-        with open(output_file, 'w') as f:
-            f.write(output)
+        with open(output_file, 'wb') as f:
+            f.write(buf)
         print(f"✓ Paths: {path_count}", file=sys.stderr)
         print(f"✓ Points: {total_points}", file=sys.stderr)
-        print(f"✓ Commands: {len(commands)}", file=sys.stderr)
+        print(f"✓ Commands: {command_count}", file=sys.stderr)
         print(f"✓ Avg points/stroke: {total_points/path_count:.1f}", file=sys.stderr)
         print(f"✓ Saved to: {output_file}", file=sys.stderr)
     else:
-        print(output)
+        buf += b"\n"
+        sys.stdout.buffer.write(buf)
 
     return 0
 
@@ -6,7 +6,63 @@ Converts text strings into handwriting-style PEN commands
 
 import sys
 import argparse
-from letter_strokes import LETTERS, LETTER_SPACING, WORD_SPACING, get_letter_strokes, get_letter_width
+from functools import lru_cache
+from itertools import cycle
+from operator import add
+from letter_strokes import LETTERS, LETTER_SPACING, WORD_SPACING, get_letter_width
+
+
+def compile_letter(strokes):
+    """
+    Compile a letter's strokes into a PEN command template
+
+    Returns:
+        (template, coords, command_count): template has a %d pair per
+        point, coords are the matching x, y values relative to the letter
+        origin (interleaved)
+    """
+    template = bytearray()
+    coords = []
+    command_count = 0
+
+    for stroke in strokes:
+        if not stroke:
+            continue
+
+        template += b"PEN_DOWN %d %d\n"
+        template += b"PEN_MOVE %d %d\n" * (len(stroke) - 1)
+        template += b"PEN_UP\n"
+        for x, y in stroke:
+            coords += (x, y)
+        command_count += len(stroke) + 1
+
+    return bytes(template), tuple(coords), command_count
+
+
+# Character -> (template, coords, command_count, width), compiled once at import
+LETTER_TEMPLATES = {char: (*compile_letter(strokes), get_letter_width(char))
+                    for char, strokes in LETTERS.items()}
+
+
+def get_letter_template(char):
+    """Compiled template for a character, resolved like get_letter_strokes"""
+    return LETTER_TEMPLATES.get(char.upper(), LETTER_TEMPLATES.get(char, None))
+
+
+@lru_cache(maxsize=512)
+def get_scaled_letter(char, scale):
+    """
+    get_letter_template with the coords and width already scaled
+
+    Text repeats the same few characters at one scale, so each
+    (char, scale) pair is only scaled once.
+    """
+    letter = get_letter_template(char)
+    if letter is None:
+        return None
+
+    template, coords, command_count, width = letter
+    return template, tuple([int(c * scale) for c in coords]), command_count, int(width * scale)
 
 
 def text_to_pen(text, start_x=100, start_y=200, scale=1.0, line_height=100):
@@ -21,9 +77,11 @@ def text_to_pen(text, start_x=100, start_y=200, scale=1.0, line_height=100):
         line_height: Vertical spacing for newlines
 
     Returns:
-        List of PEN command strings
+        (buf, command_count): PEN commands as newline-terminated bytes
+        and how many there are
     """
-    commands = []
+    buf = bytearray()
+    command_count = 0
     cursor_x = start_x
     cursor_y = start_y
 
@@ -34,10 +92,10 @@ def text_to_pen(text, start_x=100, start_y=200, scale=1.0, line_height=100):
             cursor_y += int(line_height * scale)
             continue
 
-        # Get letter strokes
-        strokes = get_letter_strokes(char)
+        # Get letter template
+        letter = get_scaled_letter(char, scale)
 
-        if strokes is None:
+        if letter is None:
             # Unknown character, skip
             cursor_x += int(30 * scale)
             continue
@@ -47,30 +105,15 @@ def text_to_pen(text, start_x=100, start_y=200, scale=1.0, line_height=100):
             cursor_x += int(WORD_SPACING * scale)
             continue
 
-        # Draw each stroke
-        for stroke in strokes:
-            if not stroke:
-                continue
-
-            # First point: PEN_DOWN
-            x, y = stroke[0]
-            abs_x = cursor_x + int(x * scale)
-            abs_y = cursor_y + int(y * scale)
-            commands.append(f"PEN_DOWN {abs_x} {abs_y}")
-
-            # Remaining points: PEN_MOVE
-            for x, y in stroke[1:]:
-                abs_x = cursor_x + int(x * scale)
-                abs_y = cursor_y + int(y * scale)
-                commands.append(f"PEN_MOVE {abs_x} {abs_y}")
-
-            # End stroke
-            commands.append("PEN_UP")
+        # Draw every stroke with one format of the letter's template
+        template, offsets, count, advance = letter
+        buf += template % tuple(map(add, offsets, cycle((cursor_x, cursor_y))))
+        command_count += count
 
         # Advance cursor
-        cursor_x += int(get_letter_width(char) * scale)
+        cursor_x += advance
 
-    return commands
+    return buf, command_count
 
 
 def calculate_text_bounds(text, scale=1.0, line_height=100):
@@ -172,34 +215,33 @@ Supported characters:
         start_x, start_y = 100, 200
 
     # Generate commands
-    commands = text_to_pen(text, start_x, start_y, args.scale, args.line_height)
+    buf, command_count = text_to_pen(text, start_x, start_y, args.scale, args.line_height)
 
-    if not commands:
+    if not buf:
         print("Error: No commands generated (empty text or unsupported characters)", file=sys.stderr)
         return 1
 
     # Output
-    output = '\n'.join(commands) + '\n'
-
     if args.output:
-        with open(args.output, 'w') as f:
-            f.write(output)
+        with open(args.output, 'wb') as f:
+            f.write(buf)
 
         # Show stats
         if args.stats or True:  # Always show stats for file output
             char_count = len([c for c in text if c != '\n' and c != ' '])
             print(f"✓ Text: {repr(text)}", file=sys.stderr)
             print(f"✓ Characters: {char_count}", file=sys.stderr)
-            print(f"✓ Commands: {len(commands)}", file=sys.stderr)
+            print(f"✓ Commands: {command_count}", file=sys.stderr)
             print(f"✓ Position: ({start_x}, {start_y})", file=sys.stderr)
             print(f"✓ Scale: {args.scale}", file=sys.stderr)
             print(f"✓ Saved to: {args.output}", file=sys.stderr)
     else:
-        print(output)
+        buf += b"\n"
+        sys.stdout.buffer.write(buf)
 
         if args.stats:
             char_count = len([c for c in text if c != '\n' and c != ' '])
-            print(f"# Characters: {char_count}, Commands: {len(commands)}", file=sys.stderr)
+            print(f"# Characters: {char_count}, Commands: {command_count}", file=sys.stderr)
 
     return 0
 
@@ -17,14 +17,35 @@ WACOM_MAX_Y = 15725
 MARGIN = 2000
 
 
+def number_strokes(size):
+    """Strokes of the numbers 1-4 as (dx, dy) offsets from the top-left corner."""
+    return {
+        1: [[(size//2, 0), (size//2, size)],
+            [(0, size), (size, size)]],
+        2: [[(0, size//4), (0, 0), (size, 0), (size, size//2), (0, size), (size, size)]],
+        3: [[(0, 0), (size, 0), (size, size//2), (0, size//2)],
+            [(size, size//2), (size, size), (0, size)]],
+        4: [[(0, 0), (0, size//2), (size, size//2)],
+            [(size, 0), (size, size)]],
+    }
+
+
+NUMBER_STROKES = number_strokes(800)
+
+
+def draw_stroke(points):
+    """PEN commands for one stroke through the given (x, y) points."""
+    (x, y), *rest = points
+    commands = [f"PEN_DOWN {x} {y}"]
+    commands.extend(f"PEN_MOVE {x} {y}" for x, y in rest)
+    commands.append("PEN_UP")
+    return commands
+
+
 def draw_arrow(start_x, start_y, end_x, end_y):
     """Draw an arrow from start to end."""
-    commands = []
-
     # Main line
-    commands.append(f"PEN_DOWN {start_x} {start_y}")
-    commands.append(f"PEN_MOVE {end_x} {end_y}")
-    commands.append("PEN_UP")
+    commands = draw_stroke([(start_x, start_y), (end_x, end_y)])
 
     # Arrow head (simple V shape)
     dx = end_x - start_x
@@ -53,10 +74,7 @@ def draw_arrow(start_x, start_y, end_x, end_y):
         right_x = int(back_x - perp_x * head_width)
         right_y = int(back_y - perp_y * head_width)
 
-        commands.append(f"PEN_DOWN {left_x} {left_y}")
-        commands.append(f"PEN_MOVE {end_x} {end_y}")
-        commands.append(f"PEN_MOVE {right_x} {right_y}")
-        commands.append("PEN_UP")
+        commands.extend(draw_stroke([(left_x, left_y), (end_x, end_y), (right_x, right_y)]))
 
     return commands
 
@@ -64,49 +82,8 @@ def draw_arrow(start_x, start_y, end_x, end_y):
 def draw_number(base_x, base_y, number):
     """Draw a number (1-4) as strokes."""
     commands = []
-    size = 800
-
-    if number == 1:
-        # Draw "1"
-        commands.append(f"PEN_DOWN {base_x + size//2} {base_y}")
-        commands.append(f"PEN_MOVE {base_x + size//2} {base_y + size}")
-        commands.append("PEN_UP")
-        commands.append(f"PEN_DOWN {base_x} {base_y + size}")
-        commands.append(f"PEN_MOVE {base_x + size} {base_y + size}")
-        commands.append("PEN_UP")
-
-    elif number == 2:
-        # Draw "2"
-        commands.append(f"PEN_DOWN {base_x} {base_y + size//4}")
-        commands.append(f"PEN_MOVE {base_x} {base_y}")
-        commands.append(f"PEN_MOVE {base_x + size} {base_y}")
-        commands.append(f"PEN_MOVE {base_x + size} {base_y + size//2}")
-        commands.append(f"PEN_MOVE {base_x} {base_y + size}")
-        commands.append(f"PEN_MOVE {base_x + size} {base_y + size}")
-        commands.append("PEN_UP")
-
-    elif number == 3:
-        # Draw "3"
-        commands.append(f"PEN_DOWN {base_x} {base_y}")
-        commands.append(f"PEN_MOVE {base_x + size} {base_y}")
-        commands.append(f"PEN_MOVE {base_x + size} {base_y + size//2}")
-        commands.append(f"PEN_MOVE {base_x} {base_y + size//2}")
-        commands.append("PEN_UP")
-        commands.append(f"PEN_DOWN {base_x + size} {base_y + size//2}")
-        commands.append(f"PEN_MOVE {base_x + size} {base_y + size}")
-        commands.append(f"PEN_MOVE {base_x} {base_y + size}")
-        commands.append("PEN_UP")
-
-    elif number == 4:
-        # Draw "4"
-        commands.append(f"PEN_DOWN {base_x} {base_y}")
-        commands.append(f"PEN_MOVE {base_x} {base_y + size//2}")
-        commands.append(f"PEN_MOVE {base_x + size} {base_y + size//2}")
-        commands.append("PEN_UP")
-        commands.append(f"PEN_DOWN {base_x + size} {base_y}")
-        commands.append(f"PEN_MOVE {base_x + size} {base_y + size}")
-        commands.append("PEN_UP")
-
+    for stroke in NUMBER_STROKES.get(number, ()):
+        commands.extend(draw_stroke([(base_x + dx, base_y + dy) for dx, dy in stroke]))
     return commands
 
 
@@ -159,12 +136,8 @@ def main():
 
     # Center cross for reference
     commands.append("# Center cross")
-    commands.append(f"PEN_DOWN {center_x - 1500} {center_y}")
-    commands.append(f"PEN_MOVE {center_x + 1500} {center_y}")
-    commands.append("PEN_UP")
-    commands.append(f"PEN_DOWN {center_x} {center_y - 1500}")
-    commands.append(f"PEN_MOVE {center_x} {center_y + 1500}")
-    commands.append("PEN_UP")
+    commands.extend(draw_stroke([(center_x - 1500, center_y), (center_x + 1500, center_y)]))
+    commands.extend(draw_stroke([(center_x, center_y - 1500), (center_x, center_y + 1500)]))
     commands.append("")
 
     # Save output
@@ -17,20 +17,26 @@ RM2 injection format:
 import re
 import sys
 import math
-from typing import List, Tuple, Optional
+from typing import Iterable, List, Tuple, Optional, TextIO
 
 class GCodeConverter:
-    def __init__(self, scale: float = 100.0):
+    def __init__(self, scale: float = 100.0, stream: Optional[TextIO] = None):
         """
         Args:
             scale: Scale factor for coordinates (RM2 coords ~20k for full screen)
                    Default 100 converts mm to reasonable RM2 scale
+            stream: If given, commands are written to it one per line as they
+                    are generated instead of being collected in self.commands
         """
         self.scale = scale
+        self.stream = stream
         self.x = 0.0
         self.y = 0.0
         self.z = 5.0  # Start with pen up
         self.commands = []
+        self.line_count = 0
+        self.command_count = 0
+        self.bounds = None  # [min_x, min_y, max_x, max_y] of emitted commands
         
     def parse_coordinates(self, line: str) -> dict:
         """Extract X, Y, Z, I, J from G-code line."""
@@ -42,17 +48,38 @@ class GCodeConverter:
             coords[param] = value
         return coords
     
-    def add_move(self, x: float, y: float):
-        """Add a move command (pen up)."""
+    def add_command(self, kind: str, x: float, y: float):
+        """Scale a point and emit it as a `kind x y` command."""
         x_scaled = int(x * self.scale)
         y_scaled = int(y * self.scale)
-        self.commands.append(f"M {x_scaled} {y_scaled}")
+        cmd = f"{kind} {x_scaled} {y_scaled}"
+        if self.stream is None:
+            self.commands.append(cmd)
+        else:
+            self.stream.write(cmd + '\n')
+        self.command_count += 1
+
+        # Running bounding box, so it never needs the command list
+        bounds = self.bounds
+        if bounds is None:
+            self.bounds = [x_scaled, y_scaled, x_scaled, y_scaled]
+        else:
+            if x_scaled < bounds[0]:
+                bounds[0] = x_scaled
+            elif x_scaled > bounds[2]:
+                bounds[2] = x_scaled
+            if y_scaled < bounds[1]:
+                bounds[1] = y_scaled
+            elif y_scaled > bounds[3]:
+                bounds[3] = y_scaled
+
+    def add_move(self, x: float, y: float):
+        """Add a move command (pen up)."""
+        self.add_command("M", x, y)
         
     def add_draw(self, x: float, y: float):
         """Add a draw command (pen down)."""
-        x_scaled = int(x * self.scale)
-        y_scaled = int(y * self.scale)
-        self.commands.append(f"D {x_scaled} {y_scaled}")
+        self.add_command("D", x, y)
     
     def interpolate_arc(self, end_x: float, end_y: float, 
                        center_i: float, center_j: float, 
@@ -152,30 +179,21 @@ class GCodeConverter:
             self.x = end_x
             self.y = end_y
     
-    def convert(self, gcode_lines: List[str]) -> List[str]:
-        """Convert G-code lines to injection commands."""
+    def convert(self, gcode_lines: Iterable[str]) -> List[str]:
+        """Convert G-code lines (a list or an open file) to injection commands.
+        
+        Returns the collected commands; empty when writing to a stream.
+        """
         for line in gcode_lines:
+            self.line_count += 1
             self.process_line(line)
         return self.commands
     
     def get_bounds(self) -> Tuple[float, float, float, float]:
-        """Calculate bounding box of all coordinates."""
-        if not self.commands:
+        """Bounding box of all emitted coordinates."""
+        if self.bounds is None:
             return (0, 0, 0, 0)
-        
-        x_coords = []
-        y_coords = []
-        
-        for cmd in self.commands:
-            parts = cmd.split()
-            if len(parts) == 3:
-                x_coords.append(int(parts[1]))
-                y_coords.append(int(parts[2]))
-        
-        if not x_coords:
-            return (0, 0, 0, 0)
-        
-        return (min(x_coords), min(y_coords), max(x_coords), max(y_coords))
+        return tuple(self.bounds)
 
 
 def main():
@@ -190,30 +208,25 @@ def main():
     scale = float(sys.argv[2]) if len(sys.argv) > 2 else 100.0
     output_file = sys.argv[3] if len(sys.argv) > 3 else None
     
-    # Read G-code
+    # Convert line by line, writing commands out as they are generated
     with open(input_file, 'r') as f:
-        gcode_lines = f.readlines()
-    
-    # Convert
-    converter = GCodeConverter(scale=scale)
-    commands = converter.convert(gcode_lines)
+        out = open(output_file, 'w') if output_file else sys.stdout
+        try:
+            converter = GCodeConverter(scale=scale, stream=out)
+            converter.convert(f)
+        finally:
+            if output_file:
+                out.close()
     
     # Print statistics
     min_x, min_y, max_x, max_y = converter.get_bounds()
-    print(f"# Converted {len(gcode_lines)} G-code lines to {len(commands)} injection commands", 
+    print(f"# Converted {converter.line_count} G-code lines to {converter.command_count} injection commands", 
           file=sys.stderr)
     print(f"# Bounding box: ({min_x}, {min_y}) to ({max_x}, {max_y})", file=sys.stderr)
     print(f"# Dimensions: {max_x - min_x} x {max_y - min_y}", file=sys.stderr)
     
-    # Output
     if output_file:
-        with open(output_file, 'w') as f:
-            for cmd in commands:
-                f.write(cmd + '\n')
         print(f"# Written to {output_file}", file=sys.stderr)
-    else:
-        for cmd in commands:
-            print(cmd)
 
 
 if __name__ == '__main__':
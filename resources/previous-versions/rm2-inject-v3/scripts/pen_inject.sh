@@ -168,9 +168,14 @@ echo "▶ Sending PEN commands to RM2..."
 echo "  (Xochitl is buffering commands)"
 echo ""
 
-# Count commands as we send them
+# Validate commands locally, then send them all over a single ssh
+# connection (one connection per command meant a full ssh handshake per line).
+# The remote side still opens the FIFO once per command: inject_hook builds
+# older than its line-splitting reader handle only the first command of each
+# read(), and one open per line keeps those working too
 sent=0
 failed=0
+commands=()
 
 while IFS= read -r cmd; do
     # Skip empty lines and comments
@@ -179,23 +184,22 @@ while IFS= read -r cmd; do
     # Validate command format (basic check)
     if ! [[ "$cmd" =~ ^PEN_(DOWN|MOVE|UP) ]]; then
         echo "  ⚠ Invalid command format: $cmd"
-        ((failed++))
+        failed=$((failed + 1))
         continue
     fi
     
-    # Send to RM2
-    if echo "$cmd" | ssh root@$RM2_IP "cat > $FIFO_PATH 2>/dev/null" 2>/dev/null; then
-        ((sent++))
+    commands+=("$cmd")
+done < "$COMMANDS_FILE"
+
+# Send to RM2
+if [ ${#commands[@]} -gt 0 ]; then
+    if printf '%s\n' "${commands[@]}" | ssh root@$RM2_IP "while IFS= read -r cmd; do echo \"\$cmd\" > $FIFO_PATH 2>/dev/null || exit 1; done" 2>/dev/null; then
+        sent=${#commands[@]}
     else
-        ((failed++))
-    fi
-    
-    # Progress indicator (every 100 commands)
-    if [ $((sent % 100)) -eq 0 ]; then
-        echo "  ⟳ $sent/$TOTAL_COMMANDS commands sent..."
+        failed=$((failed + ${#commands[@]}))
     fi
-    
-done < "$COMMANDS_FILE"
+fi
+echo "  ⟳ $sent/$TOTAL_COMMANDS commands sent"
 
 echo ""
 echo "==========================================="
@@ -138,6 +138,78 @@ static void track_stylus_position(struct input_event *events, int count) {
     }
 }
 
+/* Queue the input events for one PEN_* command line */
+static void handle_command(const char *line) {
+    char cmd[32];
+    int x, y;
+    
+    if (sscanf(line, "%31s %d %d", cmd, &x, &y) >= 1) {
+        
+        if (strcmp(cmd, "PEN_DOWN") == 0) {
+            struct input_event ev;
+            
+            int wacom_x = display_to_wacom_x(x);
+            int wacom_y = display_to_wacom_y(y);
+            
+            ev = make_event(EV_KEY, BTN_TOOL_PEN, 1);
+            queue_event(&ev);
+            
+            ev = make_event(EV_KEY, BTN_TOUCH, 1);
+            queue_event(&ev);
+            
+            ev = make_event(EV_ABS, ABS_X, wacom_x);
+            queue_event(&ev);
+            
+            ev = make_event(EV_ABS, ABS_Y, wacom_y);
+            queue_event(&ev);
+            
+            ev = make_event(EV_ABS, ABS_PRESSURE, 2000);
+            queue_event(&ev);
+            
+            ev = make_event(EV_SYN, SYN_REPORT, 0);
+            queue_event(&ev);
+            
+            get_current_time(&last_injection_time);
+            suppress_input = 1;
+            
+        } else if (strcmp(cmd, "PEN_MOVE") == 0) {
+            struct input_event ev;
+            
+            int wacom_x = display_to_wacom_x(x);
+            int wacom_y = display_to_wacom_y(y);
+            
+            ev = make_event(EV_ABS, ABS_X, wacom_x);
+            queue_event(&ev);
+            
+            ev = make_event(EV_ABS, ABS_Y, wacom_y);
+            queue_event(&ev);
+            
+            ev = make_event(EV_ABS, ABS_PRESSURE, 2000);
+            queue_event(&ev);
+            
+            ev = make_event(EV_SYN, SYN_REPORT, 0);
+            queue_event(&ev);
+            
+        } else if (strcmp(cmd, "PEN_UP") == 0) {
+            struct input_event ev;
+            
+            ev = make_event(EV_KEY, BTN_TOUCH, 0);
+            queue_event(&ev);
+            
+            ev = make_event(EV_KEY, BTN_TOOL_PEN, 0);
+            queue_event(&ev);
+            
+            ev = make_event(EV_SYN, SYN_REPORT, 0);
+            queue_event(&ev);
+            
+            get_current_time(&last_injection_time);
+            
+        } else if (strcmp(cmd, "GET_CURSOR") == 0) {
+            fprintf(stderr, "[INJECT] Cursor: %d %d\n", last_pen_x, last_pen_y);
+        }
+    }
+}
+
 static void* fifo_reader_thread(void* arg) {
     fprintf(stderr, "[INJECT] Server ready\n");
     
@@ -150,80 +222,37 @@ static void* fifo_reader_thread(void* arg) {
             continue;
         }
         
+        /* One read() can hold several commands, and a command can straddle
+         * two reads, whenever writers outpace this loop: keep the unfinished
+         * tail of the buffer and handle each complete line */
         char buf[4096];
+        size_t len = 0;
         ssize_t n;
         
-        while ((n = read(fd, buf, sizeof(buf) - 1)) > 0) {
-            buf[n] = '\0';
+        while ((n = read(fd, buf + len, sizeof(buf) - 1 - len)) > 0) {
+            len += n;
+            buf[len] = '\0';
             
-            char cmd[32];
-            int x, y;
+            char *line = buf;
+            char *newline;
+            while ((newline = strchr(line, '\n')) != NULL) {
+                *newline = '\0';
+                handle_command(line);
+                line = newline + 1;
+            }
             
-            if (sscanf(buf, "%s %d %d", cmd, &x, &y) >= 1) {
-                
-                if (strcmp(cmd, "PEN_DOWN") == 0) {
-                    struct input_event ev;
-                    
-                    int wacom_x = display_to_wacom_x(x);
-                    int wacom_y = display_to_wacom_y(y);
-                    
-                    ev = make_event(EV_KEY, BTN_TOOL_PEN, 1);
-                    queue_event(&ev);
-                    
-                    ev = make_event(EV_KEY, BTN_TOUCH, 1);
-                    queue_event(&ev);
-                    
-                    ev = make_event(EV_ABS, ABS_X, wacom_x);
-                    queue_event(&ev);
-                    
-                    ev = make_event(EV_ABS, ABS_Y, wacom_y);
-                    queue_event(&ev);
-                    
-                    ev = make_event(EV_ABS, ABS_PRESSURE, 2000);
-                    queue_event(&ev);
-                    
-                    ev = make_event(EV_SYN, SYN_REPORT, 0);
-                    queue_event(&ev);
-                    
-                    get_current_time(&last_injection_time);
-                    suppress_input = 1;
-                    
-                } else if (strcmp(cmd, "PEN_MOVE") == 0) {
-                    struct input_event ev;
-                    
-                    int wacom_x = display_to_wacom_x(x);
-                    int wacom_y = display_to_wacom_y(y);
-                    
-                    ev = make_event(EV_ABS, ABS_X, wacom_x);
-                    queue_event(&ev);
-                    
-                    ev = make_event(EV_ABS, ABS_Y, wacom_y);
-                    queue_event(&ev);
-                    
-                    ev = make_event(EV_ABS, ABS_PRESSURE, 2000);
-                    queue_event(&ev);
-                    
-                    ev = make_event(EV_SYN, SYN_REPORT, 0);
-                    queue_event(&ev);
-                    
-                } else if (strcmp(cmd, "PEN_UP") == 0) {
-                    struct input_event ev;
-                    
-                    ev = make_event(EV_KEY, BTN_TOUCH, 0);
-                    queue_event(&ev);
-                    
-                    ev = make_event(EV_KEY, BTN_TOOL_PEN, 0);
-                    queue_event(&ev);
-                    
-                    ev = make_event(EV_SYN, SYN_REPORT, 0);
-                    queue_event(&ev);
-                    
-                    get_current_time(&last_injection_time);
-                    
-                } else if (strcmp(cmd, "GET_CURSOR") == 0) {
-                    fprintf(stderr, "[INJECT] Cursor: %d %d\n", last_pen_x, last_pen_y);
-                }
+            len -= line - buf;
+            if (len == sizeof(buf) - 1) {
+                /* No newline in a full buffer: not a command, drop it */
+                len = 0;
             }
+            memmove(buf, line, len);
+        }
+        
+        /* Last command without a trailing newline */
+        if (len > 0) {
+            buf[len] = '\0';
+            handle_command(buf);
         }
         
         close(fd);
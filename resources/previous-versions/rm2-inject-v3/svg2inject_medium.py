@@ -12,6 +12,8 @@ import re
 import xml.etree.ElementTree as ET
 from typing import List, Tuple
 
+SVG_PATH_TAG = '{http://www.w3.org/2000/svg}path'
+
 
 def cubic_bezier_points(p0, p1, p2, p3, num_points=20):
     """
@@ -265,9 +267,6 @@ def svg_to_injection(svg_file: str, scale: float = 1.0, flip_y: bool = True,
         print(f"ERROR: Failed to parse SVG: {e}")
         return []
     
-    # Handle namespaces
-    ns = {'svg': 'http://www.w3.org/2000/svg'}
-    
     # Get SVG dimensions for Y-flip
     if flip_y and svg_height is None:
         try:
@@ -283,8 +282,9 @@ def svg_to_injection(svg_file: str, scale: float = 1.0, flip_y: bool = True,
     path_count = 0
     total_points = 0
     
-    # Find all path elements
-    for path_elem in root.findall('.//svg:path', ns) or root.findall('.//path'):
+    # Find all path elements (tag-filtered iter(), no XPath); un-namespaced
+    # paths only if there are no SVG ones
+    for path_elem in list(root.iter(SVG_PATH_TAG)) or list(root.iter('path')):
         path_count += 1
         path_data = path_elem.get('d', '')
         
@@ -307,24 +307,16 @@ def svg_to_injection(svg_file: str, scale: float = 1.0, flip_y: bool = True,
         print(f"  Generated {len(points)} points")
         total_points += len(points)
         
-        # Scale and flip Y if needed
+        # Scale (and flip Y if needed) straight into pen commands: pen down
+        # at the first point, draw the rest, pen up
+        x0, y0 = points[0]
         if flip_y:
-            scaled_points = [(x * scale, (svg_height - y) * scale) for x, y in points]
+            all_commands.append(f"PEN_DOWN {int(x0 * scale)} {int((svg_height - y0) * scale)}")
+            all_commands.extend([f"PEN_MOVE {int(x * scale)} {int((svg_height - y) * scale)}" for x, y in points[1:]])
         else:
-            scaled_points = [(x * scale, y * scale) for x, y in points]
-        
-        # Convert to pen commands
-        if scaled_points:
-            # Start with pen up, move to first point
-            x0, y0 = int(scaled_points[0][0]), int(scaled_points[0][1])
-            all_commands.append(f"PEN_DOWN {x0} {y0}")
-            
-            # Draw remaining points
-            for x, y in scaled_points[1:]:
-                all_commands.append(f"PEN_MOVE {int(x)} {int(y)}")
-            
-            # Pen up at end
-            all_commands.append("PEN_UP")
+            all_commands.append(f"PEN_DOWN {int(x0 * scale)} {int(y0 * scale)}")
+            all_commands.extend([f"PEN_MOVE {int(x * scale)} {int(y * scale)}" for x, y in points[1:]])
+        all_commands.append("PEN_UP")
     
     print(f"\nTotal paths: {path_count}")
     print(f"Total points: {total_points}")
@@ -377,15 +369,14 @@ def main():
         print("\nERROR: No commands generated!")
         sys.exit(1)
     
-    # Output
+    # Output (the whole command list in one write)
+    text = ''.join(cmd + '\n' for cmd in commands)
     if output_file:
         with open(output_file, 'w') as f:
-            for cmd in commands:
-                f.write(cmd + '\n')
+            f.write(text)
         print(f"\nWritten to: {output_file}")
     else:
-        for cmd in commands:
-            print(cmd)
+        sys.stdout.write(text)
 
 
 if __name__ == '__main__':
@@ -300,15 +300,14 @@ def main():
     
     print(f"Output: {len(pen_commands)} PEN_* commands")
     
-    # Write output
+    # Write output (the whole command list in one write)
+    text = ''.join(cmd + '\n' for cmd in pen_commands)
     if output_file:
         with open(output_file, 'w') as f:
-            for cmd in pen_commands:
-                f.write(cmd + '\n')
+            f.write(text)
         print(f"Written to {output_file}")
     else:
-        for cmd in pen_commands:
-            print(cmd)
+        sys.stdout.write(text)
 
 
 if __name__ == '__main__':
@@ -12,6 +12,8 @@ import xml.etree.ElementTree as ET
 RM2_WIDTH = 1404
 RM2_HEIGHT = 1872
 
+SVG_PATH_TAG = '{http://www.w3.org/2000/svg}path'
+
 def parse_path_data(path_str):
     """Parse SVG path d="" attribute into coordinates"""
     coords = []
@@ -87,8 +89,7 @@ def svg_to_commands(svg_file, scale=1.0, offset_x=0, offset_y=0):
     commands = []
     
     # Process all <path> elements
-    ns = {'svg': 'http://www.w3.org/2000/svg'}
-    for path in root.findall('.//svg:path', ns):
+    for path in root.iter(SVG_PATH_TAG):
         d = path.get('d')
         if not d:
             continue
@@ -9,9 +9,9 @@ Usage:
     python analyze_pen_events.py pen_shapes.txt [output_prefix]
 """
 
-import re
 import sys
 import json
+from array import array
 from pathlib import Path
 from dataclasses import dataclass, field
 from typing import List, Optional
@@ -32,7 +32,7 @@ DISPLAY_WIDTH = 1404
 DISPLAY_HEIGHT = 1872
 
 
-@dataclass
+@dataclass(slots=True)
 class PenPoint:
     """Point in a stroke."""
     x: int
@@ -41,46 +41,53 @@ class PenPoint:
     timestamp: float
 
 
-@dataclass
+@dataclass(slots=True)
 class Stroke:
-    """Complete pen stroke from touch-down to touch-up."""
-    points: List[PenPoint] = field(default_factory=list)
+    """
+    Complete pen stroke from touch-down to touch-up.
+    
+    Samples are stored column-wise in typed arrays rather than as one
+    PenPoint per sample; `points` builds PenPoints on demand.
+    """
+    xs: array = field(default_factory=lambda: array('i'))
+    ys: array = field(default_factory=lambda: array('i'))
+    pressures: array = field(default_factory=lambda: array('i'))
+    timestamps: array = field(default_factory=lambda: array('d'))
     start_time: float = 0
     end_time: float = 0
     
+    @property
+    def points(self) -> List[PenPoint]:
+        return [PenPoint(*p) for p in zip(self.xs, self.ys, self.pressures, self.timestamps)]
+    
     @property
     def duration_ms(self) -> float:
         return (self.end_time - self.start_time) * 1000
     
     @property
     def x_min(self) -> int:
-        return min(p.x for p in self.points) if self.points else 0
+        return min(self.xs) if self.xs else 0
     
     @property
     def x_max(self) -> int:
-        return max(p.x for p in self.points) if self.points else 0
+        return max(self.xs) if self.xs else 0
     
     @property
     def y_min(self) -> int:
-        return min(p.y for p in self.points) if self.points else 0
+        return min(self.ys) if self.ys else 0
     
     @property
     def y_max(self) -> int:
-        return max(p.y for p in self.points) if self.points else 0
+        return max(self.ys) if self.ys else 0
     
     @property
     def pressure_avg(self) -> float:
-        return sum(p.pressure for p in self.points) / len(self.points) if self.points else 0
+        return sum(self.pressures) / len(self.pressures) if self.pressures else 0
 
 
 class PenEventParser:
     """Parse evtest output into structured stroke data."""
     
-    EVENT_PATTERN = re.compile(
-        r'Event: time (\d+\.\d+), type \d+ \((\w+)\), code \d+ \((\w+)\), value (-?\d+)'
-    )
-    SYN_PATTERN = re.compile(r'Event: time (\d+\.\d+), -+ SYN_REPORT -+')
-    
     def __init__(self):
         self.strokes: List[Stroke] = []
         self.current_stroke: Optional[Stroke] = None
@@ -95,58 +102,71 @@ class PenEventParser:
             for line in f:
                 self._parse_line(line.strip())
         
-        if self.current_stroke and self.current_stroke.points:
+        if self.current_stroke and self.current_stroke.xs:
             self.strokes.append(self.current_stroke)
         
         return self.strokes
     
     def _parse_line(self, line: str):
         """Parse a single line of evtest output."""
-        syn_match = self.SYN_PATTERN.match(line)
-        if syn_match:
-            timestamp = float(syn_match.group(1))
+        # Skips the header and capability listing
+        if not line.startswith('Event: time '):
+            return
+        
+        # evtest's fixed layout splits into known fields:
+        #   Event: time T, type N (TYPE), code N (CODE), value V
+        #   Event: time T, -------------- SYN_REPORT ------------
+        fields = line.split(' ')
+        if len(fields) == 6 and fields[4] == 'SYN_REPORT':
+            try:
+                timestamp = float(fields[2][:-1])
+            except ValueError:
+                return
             self._process_syn(timestamp)
             return
         
-        event_match = self.EVENT_PATTERN.match(line)
-        if event_match:
-            timestamp = float(event_match.group(1))
-            event_type = event_match.group(2)
-            event_code = event_match.group(3)
-            value = int(event_match.group(4))
-            
-            if event_type == 'EV_ABS':
-                if event_code == 'ABS_X':
-                    self.state_x = value
-                elif event_code == 'ABS_Y':
-                    self.state_y = value
-                elif event_code == 'ABS_PRESSURE':
-                    self.state_pressure = value
-            
-            elif event_type == 'EV_KEY':
-                if event_code == 'BTN_TOUCH':
-                    if value == 1:
-                        self.pen_down = True
-                        self.current_stroke = Stroke()
-                        self.current_stroke.start_time = timestamp
-                    elif value == 0:
-                        self.pen_down = False
-                        if self.current_stroke:
-                            self.current_stroke.end_time = timestamp
-                            if self.current_stroke.points:
-                                self.strokes.append(self.current_stroke)
-                            self.current_stroke = None
+        if len(fields) != 11 or fields[3] != 'type':
+            return
+        
+        event_type = fields[5][1:-2]
+        event_code = fields[8][1:-2]
+        try:
+            timestamp = float(fields[2][:-1])
+            value = int(fields[10])
+        except ValueError:
+            # Truncated last line of an interrupted capture
+            return
+        
+        if event_type == 'EV_ABS':
+            if event_code == 'ABS_X':
+                self.state_x = value
+            elif event_code == 'ABS_Y':
+                self.state_y = value
+            elif event_code == 'ABS_PRESSURE':
+                self.state_pressure = value
+        
+        elif event_type == 'EV_KEY':
+            if event_code == 'BTN_TOUCH':
+                if value == 1:
+                    self.pen_down = True
+                    self.current_stroke = Stroke()
+                    self.current_stroke.start_time = timestamp
+                elif value == 0:
+                    self.pen_down = False
+                    if self.current_stroke:
+                        self.current_stroke.end_time = timestamp
+                        if self.current_stroke.xs:
+                            self.strokes.append(self.current_stroke)
+                        self.current_stroke = None
     
     def _process_syn(self, timestamp: float):
         """Process SYN_REPORT - commit current event state."""
-        if self.pen_down and self.current_stroke is not None:
-            point = PenPoint(
-                x=self.state_x,
-                y=self.state_y,
-                pressure=self.state_pressure,
-                timestamp=timestamp
-            )
-            self.current_stroke.points.append(point)
+        stroke = self.current_stroke
+        if self.pen_down and stroke is not None:
+            stroke.xs.append(self.state_x)
+            stroke.ys.append(self.state_y)
+            stroke.pressures.append(self.state_pressure)
+            stroke.timestamps.append(timestamp)
 
 
 class StrokeAnalyzer:
@@ -160,16 +180,16 @@ class StrokeAnalyzer:
         if not self.strokes:
             return {}
         
-        all_points = [p for s in self.strokes for p in s.points]
+        strokes = self.strokes
         
         return {
-            'wacom_x_min': min(p.x for p in all_points),
-            'wacom_x_max': max(p.x for p in all_points),
-            'wacom_y_min': min(p.y for p in all_points),
-            'wacom_y_max': max(p.y for p in all_points),
-            'pressure_min': min(p.pressure for p in all_points),
-            'pressure_max': max(p.pressure for p in all_points),
-            'total_points': len(all_points),
+            'wacom_x_min': min(min(s.xs) for s in strokes),
+            'wacom_x_max': max(max(s.xs) for s in strokes),
+            'wacom_y_min': min(min(s.ys) for s in strokes),
+            'wacom_y_max': max(max(s.ys) for s in strokes),
+            'pressure_min': min(min(s.pressures) for s in strokes),
+            'pressure_max': max(max(s.pressures) for s in strokes),
+            'total_points': sum(len(s.xs) for s in strokes),
             'total_strokes': len(self.strokes),
         }
     
@@ -179,13 +199,13 @@ class StrokeAnalyzer:
         for i, stroke in enumerate(self.strokes):
             summaries.append({
                 'index': i,
-                'points': len(stroke.points),
+                'points': len(stroke.xs),
                 'duration_ms': round(stroke.duration_ms, 1),
                 'x_range': f"{stroke.x_min}-{stroke.x_max}",
                 'y_range': f"{stroke.y_min}-{stroke.y_max}",
                 'pressure_avg': round(stroke.pressure_avg, 0),
-                'start': (stroke.points[0].x, stroke.points[0].y) if stroke.points else None,
-                'end': (stroke.points[-1].x, stroke.points[-1].y) if stroke.points else None,
+                'start': (stroke.xs[0], stroke.ys[0]) if stroke.xs else None,
+                'end': (stroke.xs[-1], stroke.ys[-1]) if stroke.xs else None,
             })
         return summaries
 
@@ -193,11 +213,12 @@ class StrokeAnalyzer:
 def generate_html_visualization(strokes: List[Stroke], bounds: dict, output_path: str):
     """Generate HTML file with interactive stroke visualization."""
     
-    stroke_data = []
-    for stroke in strokes:
-        stroke_data.append({
-            'points': [(p.x, p.y, p.pressure) for p in stroke.points]
-        })
+    # The same text json.dumps gives for [{'points': [(x, y, pressure), ...]}, ...],
+    # formatted directly: the values are all ints, and this skips a tuple per point
+    stroke_data = '[' + ', '.join(
+        '{"points": [' + ', '.join([f'[{x}, {y}, {p}]' for x, y, p in zip(stroke.xs, stroke.ys, stroke.pressures)]) + ']}'
+        for stroke in strokes
+    ) + ']'
     
     # Use empirical full-screen bounds for proper visualization
     wx_min = WACOM_X_MIN_USABLE
@@ -279,7 +300,7 @@ def generate_html_visualization(strokes: List[Stroke], bounds: dict, output_path
     </div>
     
     <script>
-    const strokes = {json.dumps(stroke_data)};
+    const strokes = {stroke_data};
     
     // Empirical full-screen bounds
     const WX_MIN = {wx_min};
@@ -475,16 +496,13 @@ def generate_replay_commands(strokes: List[Stroke], output_path: str):
     ]
     
     for i, stroke in enumerate(strokes):
-        if not stroke.points:
+        if not stroke.xs:
             continue
         
-        lines.append(f"# Stroke {i+1} ({len(stroke.points)} points, {stroke.duration_ms:.0f}ms)")
-        
-        p = stroke.points[0]
-        lines.append(f"PEN_DOWN {p.x} {p.y}")
+        lines.append(f"# Stroke {i+1} ({len(stroke.xs)} points, {stroke.duration_ms:.0f}ms)")
         
-        for p in stroke.points[1:]:
-            lines.append(f"PEN_MOVE {p.x} {p.y}")
+        lines.append(f"PEN_DOWN {stroke.xs[0]} {stroke.ys[0]}")
+        lines.extend([f"PEN_MOVE {x} {y}" for x, y in zip(stroke.xs[1:], stroke.ys[1:])])
         
         lines.append("PEN_UP")
         lines.append("DELAY 50")
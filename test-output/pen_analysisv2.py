@@ -6,7 +6,6 @@ Usage:
     python analyze_pen_events_v3.py pen_shapes.txt [output_prefix]
 """
 
-import re
 import sys
 import json
 from pathlib import Path
@@ -29,7 +28,7 @@ DISPLAY_WIDTH = 1404
 DISPLAY_HEIGHT = 1872
 
 
-@dataclass
+@dataclass(slots=True)
 class RawEvent:
     """Raw parsed event."""
     timestamp: float
@@ -38,7 +37,7 @@ class RawEvent:
     value: int
 
 
-@dataclass
+@dataclass(slots=True)
 class SynFrame:
     """All events between two SYN_REPORTs."""
     timestamp: float
@@ -50,7 +49,7 @@ class SynFrame:
     btn_tool_pen: Optional[int] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class PenPoint:
     """Point in a stroke."""
     x: int
@@ -59,7 +58,7 @@ class PenPoint:
     timestamp: float
 
 
-@dataclass 
+@dataclass(slots=True)
 class Stroke:
     """Complete pen stroke."""
     points: List[PenPoint] = field(default_factory=list)
@@ -72,23 +71,23 @@ class Stroke:
     
     @property
     def x_min(self) -> int:
-        return min(p.x for p in self.points) if self.points else 0
+        return min([p.x for p in self.points]) if self.points else 0
     
     @property
     def x_max(self) -> int:
-        return max(p.x for p in self.points) if self.points else 0
+        return max([p.x for p in self.points]) if self.points else 0
     
     @property
     def y_min(self) -> int:
-        return min(p.y for p in self.points) if self.points else 0
+        return min([p.y for p in self.points]) if self.points else 0
     
     @property
     def y_max(self) -> int:
-        return max(p.y for p in self.points) if self.points else 0
+        return max([p.y for p in self.points]) if self.points else 0
     
     @property
     def pressure_max(self) -> int:
-        return max((p.pressure for p in self.points), default=0)
+        return max([p.pressure for p in self.points], default=0)
     
     @property
     def pressure_avg(self) -> float:
@@ -99,11 +98,6 @@ class Stroke:
 class RawEventParser:
     """First pass: parse raw events into SynFrames."""
     
-    EVENT_PATTERN = re.compile(
-        r'Event: time (\d+\.\d+), type \d+ \((\w+)\), code \d+ \((\w+)\), value (-?\d+)'
-    )
-    SYN_PATTERN = re.compile(r'Event: time (\d+\.\d+), -+ SYN_REPORT -+')
-    
     def parse_file(self, filepath: str) -> Tuple[List[SynFrame], dict]:
         """Parse file into list of SynFrames."""
         frames = []
@@ -133,11 +127,58 @@ class RawEventParser:
                 stats['total_lines'] += 1
                 line = line.strip()
                 
+                # Skips the header and capability listing
+                if not line.startswith('Event: time '):
+                    continue
+                
+                # evtest's fixed layout splits into known fields:
+                #   Event: time T, type N (TYPE), code N (CODE), value V
+                #   Event: time T, -------------- SYN_REPORT ------------
+                fields = line.split(' ')
+                
+                # Value events outnumber SYN_REPORTs about 2:1, so try them first
+                if len(fields) == 11 and fields[3] == 'type':
+                    try:
+                        value = int(fields[10])
+                    except ValueError:
+                        # Truncated last line of an interrupted capture
+                        continue
+                    stats['event_lines'] += 1
+                    event_type = fields[5][1:-2]
+                    event_code = fields[8][1:-2]
+                    
+                    if event_type == 'EV_ABS':
+                        if event_code == 'ABS_X':
+                            current_frame.x = value
+                        elif event_code == 'ABS_Y':
+                            current_frame.y = value
+                        elif event_code == 'ABS_PRESSURE':
+                            current_frame.pressure = value
+                        elif event_code == 'ABS_DISTANCE':
+                            current_frame.distance = value
+                    
+                    elif event_type == 'EV_KEY':
+                        if event_code == 'BTN_TOUCH':
+                            current_frame.btn_touch = value
+                            if value == 1:
+                                stats['btn_touch_down'] += 1
+                            else:
+                                stats['btn_touch_up'] += 1
+                        elif event_code == 'BTN_TOOL_PEN':
+                            current_frame.btn_tool_pen = value
+                            if value == 1:
+                                stats['btn_pen_in'] += 1
+                            else:
+                                stats['btn_pen_out'] += 1
+                    continue
+                
                 # Check for SYN_REPORT
-                syn_match = self.SYN_PATTERN.match(line)
-                if syn_match:
+                if len(fields) == 6 and fields[4] == 'SYN_REPORT':
+                    try:
+                        timestamp = float(fields[2][:-1])
+                    except ValueError:
+                        continue
                     stats['syn_lines'] += 1
-                    timestamp = float(syn_match.group(1))
                     
                     # Complete current frame with running state
                     current_frame.timestamp = timestamp
@@ -166,39 +207,6 @@ class RawEventParser:
                     
                     frames.append(current_frame)
                     current_frame = SynFrame(timestamp=0)
-                    continue
-                
-                # Check for event
-                event_match = self.EVENT_PATTERN.match(line)
-                if event_match:
-                    stats['event_lines'] += 1
-                    event_type = event_match.group(2)
-                    event_code = event_match.group(3)
-                    value = int(event_match.group(4))
-                    
-                    if event_type == 'EV_ABS':
-                        if event_code == 'ABS_X':
-                            current_frame.x = value
-                        elif event_code == 'ABS_Y':
-                            current_frame.y = value
-                        elif event_code == 'ABS_PRESSURE':
-                            current_frame.pressure = value
-                        elif event_code == 'ABS_DISTANCE':
-                            current_frame.distance = value
-                    
-                    elif event_type == 'EV_KEY':
-                        if event_code == 'BTN_TOUCH':
-                            current_frame.btn_touch = value
-                            if value == 1:
-                                stats['btn_touch_down'] += 1
-                            else:
-                                stats['btn_touch_up'] += 1
-                        elif event_code == 'BTN_TOOL_PEN':
-                            current_frame.btn_tool_pen = value
-                            if value == 1:
-                                stats['btn_pen_in'] += 1
-                            else:
-                                stats['btn_pen_out'] += 1
         
         if stats['min_nonzero_pressure'] == PRESSURE_MAX:
             stats['min_nonzero_pressure'] = 0
@@ -378,11 +386,12 @@ def generate_html_visualization(strokes: List[Stroke], bounds: dict, stats: dict
                                 gaps: List[dict], output_path: str):
     """Generate HTML visualization."""
     
-    stroke_data = []
-    for stroke in strokes:
-        stroke_data.append({
-            'points': [(p.x, p.y, p.pressure) for p in stroke.points],
-        })
+    # The same text json.dumps gives for [{'points': [(x, y, pressure), ...]}, ...],
+    # formatted directly: the values are all ints, and this skips a tuple per point
+    stroke_data = '[' + ', '.join(
+        '{"points": [' + ', '.join([f'[{p.x}, {p.y}, {p.pressure}]' for p in stroke.points]) + ']}'
+        for stroke in strokes
+    ) + ']'
     
     wx_min = WACOM_X_MIN_USABLE
     wx_max = WACOM_X_MAX_USABLE
@@ -471,7 +480,7 @@ def generate_html_visualization(strokes: List[Stroke], bounds: dict, stats: dict
     </div>
     
     <script>
-    const strokes = {json.dumps(stroke_data)};
+    const strokes = {stroke_data};
     
     const WX_MIN = {wx_min}, WX_MAX = {wx_max};
     const WY_MIN = {wy_min}, WY_MAX = {wy_max};
@@ -670,15 +679,18 @@ def main():
     
     # Calculate bounds
     if strokes:
-        all_points = [p for s in strokes for p in s.points]
+        # One column per field so each bound is a single C-level min/max
+        xs = [p.x for s in strokes for p in s.points]
+        ys = [p.y for s in strokes for p in s.points]
+        pressures = [p.pressure for s in strokes for p in s.points]
         bounds = {
-            'wacom_x_min': min(p.x for p in all_points),
-            'wacom_x_max': max(p.x for p in all_points),
-            'wacom_y_min': min(p.y for p in all_points),
-            'wacom_y_max': max(p.y for p in all_points),
-            'pressure_min': min(p.pressure for p in all_points),
-            'pressure_max': max(p.pressure for p in all_points),
-            'total_points': len(all_points),
+            'wacom_x_min': min(xs),
+            'wacom_x_max': max(xs),
+            'wacom_y_min': min(ys),
+            'wacom_y_max': max(ys),
+            'pressure_min': min(pressures),
+            'pressure_max': max(pressures),
+            'total_points': len(xs),
             'total_strokes': len(strokes),
         }
     else:
@@ -701,16 +713,16 @@ def main():
     
     # Replay file
     replay_path = output_dir / f"{output_prefix}_replay.txt"
+    lines = [f"# Strokes: {len(strokes)}, Method: {method}", ""]
+    for i, s in enumerate(strokes):
+        if not s.points:
+            continue
+        lines.append(f"# Stroke {i+1} ({len(s.points)} pts)")
+        lines.append(f"PEN_DOWN {s.points[0].x} {s.points[0].y}")
+        lines.extend([f"PEN_MOVE {p.x} {p.y}" for p in s.points[1:]])
+        lines.extend(("PEN_UP", "DELAY 50", ""))
     with open(replay_path, 'w', encoding='utf-8') as f:
-        f.write(f"# Strokes: {len(strokes)}, Method: {method}\n\n")
-        for i, s in enumerate(strokes):
-            if not s.points:
-                continue
-            f.write(f"# Stroke {i+1} ({len(s.points)} pts)\n")
-            f.write(f"PEN_DOWN {s.points[0].x} {s.points[0].y}\n")
-            for p in s.points[1:]:
-                f.write(f"PEN_MOVE {p.x} {p.y}\n")
-            f.write("PEN_UP\nDELAY 50\n\n")
+        f.write('\n'.join(lines) + '\n')
     print(f"Created: {replay_path}")
     
     # JSON analysis